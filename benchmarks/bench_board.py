@@ -0,0 +1,53 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from snake_learner.snake_action import TURN_TABLE, SnakeAction
+
+ROWS, COLUMNS = 32, 32
+# Food is kept off the board, so the snake circles forever at a fixed length.
+NO_FOOD = np.array([-1, -1])
+
+
+@pytest.mark.parametrize("length", [3, 64, 512])
+def test_move(benchmark, cycle_board, cycle_directions, length):
+    board = cycle_board(ROWS, COLUMNS, length)
+    board.food = NO_FOOD
+    directions = itertools.cycle(cycle_directions(ROWS, COLUMNS, length))
+
+    benchmark(lambda: board.move(next(directions)))
+
+    assert not board.done
+
+
+@pytest.mark.parametrize("length", [3, 64, 512])
+def test_turn(benchmark, cycle_board, cycle_directions, length):
+    board = cycle_board(ROWS, COLUMNS, length)
+    board.food = NO_FOOD
+    directions = cycle_directions(ROWS, COLUMNS, length)
+    # The direction of the move that brought the head to its cell.
+    board.direction = directions[-1]
+    actions = itertools.cycle(
+        [
+            SnakeAction(
+                list(TURN_TABLE[direction.value]).index(next_direction.value)
+            )
+            for direction, next_direction in zip(
+                directions[-1:] + directions[:-1], directions
+            )
+        ]
+    )
+
+    benchmark(lambda: board.turn(next(actions)))
+
+    assert not board.done
+
+
+@pytest.mark.parametrize("fill", [0.5, 0.9, 0.99])
+def test_put_random_food(benchmark, cycle_board, fill):
+    board = cycle_board(ROWS, COLUMNS, int(ROWS * COLUMNS * fill))
+
+    benchmark(board.put_random_food)
+
+    assert not board.location_in_snake(board.food)
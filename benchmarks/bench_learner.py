@@ -0,0 +1,18 @@
+import pytest
+
+from snake_learner.learner import SnakeLearner
+from snake_learner.view_getter import DistancesViewGetter
+
+
+@pytest.mark.parametrize("encoding", [
+    DistancesViewGetter.STRING_ENCODING, DistancesViewGetter.INTEGER_ENCODING
+])
+def test_run_train_iteration(benchmark, configuration, encoding):
+    view_getter = DistancesViewGetter(
+        sight_distance=configuration.pop("sight_distance"), encoding=encoding
+    )
+    learner = SnakeLearner(
+        view_getter=view_getter, record_history=False, seed=0, **configuration
+    )
+
+    benchmark.pedantic(learner.run_train_iteration, rounds=200, warmup_rounds=20)
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from snake_learner.learner import SnakeLearner
+from snake_learner.q_file import BINARY_FORMAT, JSON_FORMAT, Q_FILE_SUFFIXES, \
+    save_q
+from snake_learner.snake_action import SnakeAction
+from snake_learner.view_getter import DistancesViewGetter
+
+STATES_NUMBERS = [10_000, 1_000_000]
+# Small files take milliseconds, which is too short for three rounds to
+# give a stable minimum.
+ROUNDS = {10_000: 20, 1_000_000: 3}
+
+
+def q_items(states_number):
+    random = np.random.default_rng(0)
+    states = random.choice(10 * states_number, size=states_number, replace=False)
+    return states.tolist(), random.normal(size=(states_number, len(SnakeAction)))
+
+
+def build_learner(configuration):
+    view_getter = DistancesViewGetter(
+        sight_distance=configuration.pop("sight_distance"),
+        encoding=DistancesViewGetter.INTEGER_ENCODING,
+    )
+    return SnakeLearner(view_getter=view_getter, **configuration)
+
+
+@pytest.mark.parametrize("q_format", [JSON_FORMAT, BINARY_FORMAT])
+@pytest.mark.parametrize("states_number", STATES_NUMBERS)
+def test_save_q(benchmark, tmp_path, states_number, q_format):
+    states, values = q_items(states_number)
+    path = tmp_path / f"q_values{Q_FILE_SUFFIXES[q_format]}"
+
+    benchmark.pedantic(
+        save_q, args=(states, values, path), kwargs=dict(q_format=q_format),
+        rounds=ROUNDS[states_number],
+    )
+
+
+@pytest.mark.parametrize(
+    ["q_format", "lazy"],
+    [(JSON_FORMAT, False), (BINARY_FORMAT, False), (BINARY_FORMAT, True)],
+)
+@pytest.mark.parametrize("states_number", STATES_NUMBERS)
+def test_load_q(benchmark, tmp_path, configuration, states_number, q_format, lazy):
+    states, values = q_items(states_number)
+    path = tmp_path / f"q_values{Q_FILE_SUFFIXES[q_format]}"
+    save_q(states, values, path, q_format=q_format)
+    learner = build_learner(configuration)
+
+    benchmark.pedantic(
+        learner.load_q_from_file, args=(path,), kwargs=dict(lazy=lazy),
+        rounds=ROUNDS[states_number],
+    )
+
+    if lazy:
+        assert len(learner.q.q_file) == states_number
+    else:
+        assert learner.states_number == states_number
@@ -0,0 +1,32 @@
+import pytest
+
+from snake_learner.view_getter import DistancesViewGetter, GridViewGetter
+
+ROWS, COLUMNS, LENGTH = 16, 16, 40
+
+
+@pytest.mark.parametrize(
+    ["sight_distance", "encoding"],
+    [
+        (sight_distance, DistancesViewGetter.STRING_ENCODING)
+        for sight_distance in [1, 3, 5, None]
+    ] + [
+        (sight_distance, DistancesViewGetter.INTEGER_ENCODING)
+        for sight_distance in [1, 3, 5]
+    ],
+)
+def test_distances_view(benchmark, cycle_board, sight_distance, encoding):
+    board = cycle_board(ROWS, COLUMNS, LENGTH)
+    view_getter = DistancesViewGetter(
+        sight_distance=sight_distance, encoding=encoding
+    )
+
+    benchmark(view_getter.get_view, board)
+
+
+@pytest.mark.parametrize("sight_distance", [1, 3, 5])
+def test_grid_view(benchmark, cycle_board, sight_distance):
+    board = cycle_board(ROWS, COLUMNS, LENGTH)
+    view_getter = GridViewGetter(sight_distance=sight_distance)
+
+    benchmark(view_getter.get_view, board)
@@ -0,0 +1,80 @@
+import json
+import sys
+from pathlib import Path
+
+import click
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+STATISTICS = ["min", "median", "mean"]
+
+
+def load_results(results_path):
+    # Keeps the summary statistics of a pytest-benchmark --benchmark-json file.
+    with open(results_path, mode="r") as fd:
+        results = json.load(fd)
+    return {
+        benchmark["fullname"]: {
+            statistic: benchmark["stats"][statistic] for statistic in STATISTICS
+        }
+        for benchmark in results["benchmarks"]
+    }
+
+
+def compare_results(results, baseline, statistic, tolerance):
+    regressions = []
+    for name, stats in sorted(results.items()):
+        if name not in baseline:
+            click.echo(f"{name} - new benchmark")
+            continue
+        ratio = stats[statistic] / baseline[name][statistic]
+        click.echo(f"{name} - {ratio:.2f}x baseline {statistic}")
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+    return regressions
+
+
+@click.command()
+@click.argument("results_path", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "-b", "--baseline-path",
+    type=click.Path(dir_okay=False),
+    default=str(BASELINE_PATH),
+    help="Baseline file",
+)
+@click.option(
+    "--statistic",
+    type=click.Choice(STATISTICS),
+    default="min",
+    help="Statistic to compare. The minimum is the least affected by other "
+    "processes.",
+)
+@click.option(
+    "--tolerance",
+    type=float,
+    default=0.2,
+    help="Allowed slowdown relative to the baseline",
+)
+@click.option(
+    "--update/--no-update",
+    default=False,
+    help="Replace the baseline with the results",
+)
+def compare_baseline(results_path, baseline_path, statistic, tolerance, update):
+    results = load_results(results_path)
+    if update:
+        with open(baseline_path, mode="w") as fd:
+            json.dump(results, fd, indent=2, sort_keys=True)
+        click.echo(f"Saved {len(results)} benchmarks to {baseline_path}")
+        return
+    with open(baseline_path, mode="r") as fd:
+        baseline = json.load(fd)
+    regressions = compare_results(results, baseline, statistic, tolerance)
+    if len(regressions) != 0:
+        click.echo(f"{len(regressions)} benchmarks regressed:")
+        for name in regressions:
+            click.echo(f"  {name}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    compare_baseline()
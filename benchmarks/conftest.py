@@ -0,0 +1,61 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from snake_learner.board import SnakeBoard
+from snake_learner.linalg_util import closest_direction
+
+CONFIGURATION_PATH = Path(__file__).parent.parent / "configuration.json"
+
+
+def cycle_cells(rows, columns):
+    # A Hamiltonian cycle for an even number of rows: right along the first
+    # row, serpentine over the other columns and back up the first column.
+    cells = [[0, column] for column in range(columns)]
+    for row in range(1, rows):
+        row_columns = range(columns - 1, 0, -1) if row % 2 == 1 else range(1, columns)
+        cells.extend([row, column] for column in row_columns)
+    cells.extend([row, 0] for row in range(rows - 1, 0, -1))
+    return cells
+
+
+def build_cycle_board(rows, columns, length, seed=0):
+    cells = cycle_cells(rows, columns)
+    board = SnakeBoard(
+        rows=rows, columns=columns, random=np.random.default_rng(seed)
+    )
+    board.snake = cells[:length]
+    board.direction = closest_direction(
+        np.subtract(cells[length % len(cells)], cells[length - 1])
+    )
+    board.put_random_food()
+    return board
+
+
+def build_cycle_directions(rows, columns, length):
+    # Directions that keep the snake of the given length on the cycle,
+    # starting from its initial head.
+    cells = cycle_cells(rows, columns)
+    directions = [
+        closest_direction(np.subtract(cells[(i + 1) % len(cells)], cells[i]))
+        for i in range(len(cells))
+    ]
+    return directions[length - 1:] + directions[:length - 1]
+
+
+@pytest.fixture
+def cycle_board():
+    return build_cycle_board
+
+
+@pytest.fixture
+def cycle_directions():
+    return build_cycle_directions
+
+
+@pytest.fixture
+def configuration():
+    with open(CONFIGURATION_PATH, mode="r") as fd:
+        return json.load(fd)
@@ -0,0 +1,58 @@
+import json
+import time
+from pathlib import Path
+
+import click
+
+from snake_learner.learner import SnakeLearner
+from snake_learner.parallel import ParallelTrainer
+from snake_learner.q_table import SharedQTable
+from snake_learner.view_getter import DistancesViewGetter
+
+CONFIGURATION_PATH = Path(__file__).parent.parent / "configuration.json"
+
+
+@click.command()
+@click.option("--iterations", type=int, default=2_000, help="Games per run.")
+@click.option(
+    "-w", "--workers",
+    type=int,
+    multiple=True,
+    default=[1, 2, 4, 8],
+    help="Worker counts to measure.",
+)
+@click.option("--sync-iterations", type=int, default=100)
+def hogwild_scaling(iterations, workers, sync_iterations):
+    with open(CONFIGURATION_PATH, mode="r") as fd:
+        configuration = json.load(fd)
+    view_getter = DistancesViewGetter(
+        sight_distance=configuration.pop("sight_distance"),
+        encoding=DistancesViewGetter.INTEGER_ENCODING,
+    )
+    base_rate = None
+    for workers_number in workers:
+        learner = SnakeLearner(
+            view_getter=view_getter, record_history=False, **configuration
+        )
+        learner.q = SharedQTable(states_number=view_getter.states_number)
+        with ParallelTrainer(
+            learner=learner,
+            workers_number=workers_number,
+            sync_iterations=sync_iterations,
+        ) as trainer:
+            start = time.perf_counter()
+            for _ in trainer.train(iterations):
+                pass
+            rate = iterations / (time.perf_counter() - start)
+        learner.q.close()
+        if base_rate is None:
+            base_rate = rate
+        click.echo(
+            f"Workers - {workers_number}, "
+            f"Games per second - {rate:.1f}, "
+            f"Speedup - {rate / base_rate:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    hogwild_scaling()
@@ -4,10 +4,15 @@ from pathlib import Path
 
 import click
 
+from snake_learner.checkpoint import Checkpointer, has_checkpoint, load_checkpoint
 from snake_learner.learner import SnakeLearner
-from snake_learner.plot_util import plot_field_history, plot_int_field_histogram, \
-    plot_float_field_histogram, plot_recent_mean_field_history, plot_max_field_history, \
-    plot_values_histogram
+from snake_learner.parallel import ParallelTrainer, play_best_of
+from snake_learner.profiler import PROFILE_FILE, PSTATS_FILE, Profiler, \
+    start_cprofile
+from snake_learner.q_file import BINARY_FORMAT, JSON_FORMAT, Q_FILE_SUFFIXES, \
+    convert_q_file
+from snake_learner.q_table import SharedQTable
+from snake_learner.report import PlotReport
 from snake_learner.snake_animation import SnakeAnimation
 from snake_learner.view_getter import DistancesViewGetter
 
@@ -17,6 +22,53 @@ def snake():
     pass
 
 
+def train_iterations(learner, iterations, workers, sync_iterations):
+    if workers <= 1:
+        for _ in range(iterations):
+            learner.run_train_iteration()
+            yield 1
+        return
+    with ParallelTrainer(
+        learner=learner,
+        workers_number=workers,
+        sync_iterations=sync_iterations,
+    ) as trainer:
+        yield from trainer.train(iterations)
+
+
+def check_cprofile(profile, cprofile):
+    if cprofile and not profile:
+        raise click.UsageError("--cprofile requires --profile")
+
+
+def start_profile(learner, cprofile):
+    learner.profiler = Profiler()
+    if cprofile:
+        return start_cprofile()
+    return None
+
+
+def finish_profile(learner, output_dir, cprofile):
+    learner.profiler.stop()
+    if cprofile is not None:
+        cprofile.disable()
+    click.echo(learner.profiler.report())
+    if output_dir is None:
+        return
+    learner.profiler.save(Path(output_dir) / PROFILE_FILE)
+    if cprofile is not None:
+        cprofile.dump_stats(Path(output_dir) / PSTATS_FILE)
+
+
+def build_view_getter(configuration):
+    return DistancesViewGetter(
+        sight_distance=configuration.pop("sight_distance", None),
+        encoding=configuration.pop(
+            "view_encoding", DistancesViewGetter.STRING_ENCODING
+        ),
+    )
+
+
 @snake.command("train")
 @click.option(
     "-o", "--output-dir",
@@ -55,11 +107,92 @@ def snake():
     type=click.Choice(["gif", "mp4"], case_sensitive=False),
     default="gif"
 )
+@click.option(
+    "--raster/--no-raster",
+    default=False,
+    help="Paint animation frames directly instead of drawing them with matplotlib",
+)
+@click.option(
+    "--max-frames",
+    type=click.IntRange(min=1),
+    help="Skip uneventful moves to keep the animation under n frames",
+)
+@click.option(
+    "--animation-duration",
+    type=click.FloatRange(min=0, min_open=True),
+    help="Skip uneventful moves to keep the animation under n seconds",
+)
 @click.option(
     "--min-state-strength",
     type=float,
     help="Minimum strength for state to be saved"
 )
+@click.option(
+    "--state-strength-percentile",
+    type=click.FloatRange(0, 100),
+    help="Only save states at or above this percentile of strengths",
+)
+@click.option(
+    "--top-states",
+    type=click.IntRange(min=0),
+    help="Only save the n strongest states",
+)
+@click.option(
+    "-w", "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of processes playing training games",
+)
+@click.option(
+    "--sync-iterations",
+    type=click.IntRange(min=1),
+    default=100,
+    help="Games each worker plays between Q table merges",
+)
+@click.option(
+    "--q-format",
+    type=click.Choice([JSON_FORMAT, BINARY_FORMAT], case_sensitive=False),
+    default=JSON_FORMAT,
+    help="Format of the saved Q file",
+)
+@click.option(
+    "--checkpoint-iterations",
+    type=int,
+    help="Checkpoint changed Q values and history every n iterations",
+)
+@click.option(
+    "--checkpoint-seconds",
+    type=float,
+    help="Checkpoint changed Q values and history every n seconds",
+)
+@click.option(
+    "--resume/--no-resume",
+    default=False,
+    help="Resume training from the checkpoint in the output directory",
+)
+@click.option(
+    "--spill-history/--no-spill-history",
+    default=False,
+    help="Keep training history in memory mapped files in the output directory",
+)
+@click.option(
+    "--hogwild/--no-hogwild",
+    default=False,
+    help=(
+        "Let workers update one shared memory Q table without locks. "
+        "Requires integer view encoding."
+    ),
+)
+@click.option(
+    "--profile/--no-profile",
+    default=False,
+    help="Report time spent in every phase of a move",
+)
+@click.option(
+    "--cprofile/--no-cprofile",
+    default=False,
+    help=f"Also dump cProfile statistics to {PSTATS_FILE} (requires --profile)",
+)
 def train_snake(
     output_dir,
     q_file,
@@ -68,23 +201,85 @@ def train_snake(
     plot_window,
     animate,
     animation_output_type,
+    raster,
+    max_frames,
+    animation_duration,
     min_state_strength,
+    state_strength_percentile,
+    top_states,
+    workers,
+    sync_iterations,
+    q_format,
+    checkpoint_iterations,
+    checkpoint_seconds,
+    resume,
+    spill_history,
+    hogwild,
+    profile,
+    cprofile,
 ):
+    check_cprofile(profile, cprofile)
     output_dir = Path(output_dir)
     output_dir.mkdir(exist_ok=True)
     with open(configuration_file, mode="r") as fd:
         configuration = json.load(fd)
-    view_getter = DistancesViewGetter(
-        sight_distance=configuration.pop("sight_distance", None)
+    view_getter = build_view_getter(configuration)
+    learner = SnakeLearner(
+        view_getter=view_getter,
+        record_history=animate,
+        statistics_window=plot_window,
+        history_dir=output_dir / "history" if spill_history else None,
+        **configuration,
     )
-    learner = SnakeLearner(view_getter=view_getter, **configuration)
+    if configuration.get("max_states") is not None and (workers > 1 or hogwild):
+        raise click.UsageError(
+            '"max_states" is only supported with a single worker'
+        )
+    if hogwild:
+        if view_getter.encoding != DistancesViewGetter.INTEGER_ENCODING:
+            raise click.UsageError(
+                'Hogwild training requires "view_encoding": "integer"'
+            )
+        learner.q = SharedQTable(states_number=view_getter.states_number)
     if q_file is not None:
         learner.load_q_from_file(q_file)
+    checkpoint_dir = output_dir / "checkpoint"
+    resume_sequence = None
+    if resume:
+        if not has_checkpoint(checkpoint_dir):
+            raise click.UsageError(f"No checkpoint found in {checkpoint_dir}")
+        q_values, history, resume_sequence = load_checkpoint(checkpoint_dir)
+        learner.q.update(
+            {view_getter.parse_key(str(key)): val for key, val in q_values.items()}
+        )
+        for history_point in history:
+            learner.add_history_point(history_point)
+        click.echo(f"Resumed after {len(history)} iterations")
+    checkpointer = None
+    if checkpoint_iterations is not None or checkpoint_seconds is not None:
+        if hogwild:
+            raise click.UsageError("Checkpoints are not supported with hogwild")
+        checkpointer = Checkpointer(
+            learner=learner,
+            directory=checkpoint_dir,
+            every_iterations=checkpoint_iterations,
+            every_seconds=checkpoint_seconds,
+            resume_sequence=resume_sequence,
+        )
+    cprofiler = start_profile(learner, cprofile) if profile else None
     click.echo("Start learning...")
+    completed_iterations = train_iterations(
+        learner=learner,
+        iterations=iterations,
+        workers=workers,
+        sync_iterations=sync_iterations,
+    )
     with click.progressbar(length=iterations, show_pos=True) as bar:
         try:
-            for _ in bar:
-                learner.run_train_iteration()
+            for completed in completed_iterations:
+                bar.update(completed)
+                if checkpointer is not None:
+                    checkpointer.update(completed)
                 score_mean = learner.recent_scores_mean(plot_window)
                 rewards_mean = learner.recent_rewards_mean(plot_window)
                 duration_mean = learner.recent_duration_mean(plot_window)
@@ -95,120 +290,41 @@ def train_snake(
                     f"States - {learner.states_number}"
                 )
         except KeyboardInterrupt:
+            completed_iterations.close()
             click.echo()
             if not click.confirm(
                 "Training interrupted. Would you like to save the results?",
                 default=False
             ):
                 return
-    if min_state_strength is not None:
-        learner.clear_states_by_strength(min_state_strength)
-    plot_field_history(
+        finally:
+            if checkpointer is not None:
+                checkpointer.close()
+    if profile:
+        finish_profile(learner, output_dir, cprofiler)
+    with PlotReport(
         history=learner.history,
+        state_strengths=learner.state_strengths,
         output_dir=output_dir,
-        field="rewards",
-    )
-    plot_recent_mean_field_history(
-        history=learner.history,
-        output_dir=output_dir,
-        field="rewards",
-        n=plot_window,
-    )
-    plot_max_field_history(
-        history=learner.history,
-        output_dir=output_dir,
-        field="rewards",
-    )
-    plot_float_field_histogram(
-        history=learner.history,
-        output_dir=output_dir,
-        field="rewards",
-        bins=50,
-    )
-    plot_field_history(
-        history=learner.history,
-        output_dir=output_dir,
-        field="score",
-    )
-    plot_recent_mean_field_history(
-        history=learner.history,
-        output_dir=output_dir,
-        field="score",
-        n=plot_window,
-    )
-    plot_max_field_history(
-        history=learner.history,
-        output_dir=output_dir,
-        field="score",
-    )
-    plot_int_field_histogram(
-        history=learner.history,
-        output_dir=output_dir,
-        field="score",
-    )
-    plot_field_history(
-        history=learner.history,
-        output_dir=output_dir,
-        field="duration",
-    )
-    plot_recent_mean_field_history(
-        history=learner.history,
-        output_dir=output_dir,
-        field="duration",
-        n=plot_window,
-    )
-    plot_max_field_history(
-        history=learner.history,
-        output_dir=output_dir,
-        field="duration",
-    )
-    plot_int_field_histogram(
-        history=learner.history,
-        output_dir=output_dir,
-        field="duration",
-    )
-    plot_field_history(
-        history=learner.history,
-        output_dir=output_dir,
-        field="velocity",
-    )
-    plot_recent_mean_field_history(
-        history=learner.history,
-        output_dir=output_dir,
-        field="velocity",
-        n=plot_window,
-    )
-    plot_max_field_history(
-        history=learner.history,
-        output_dir=output_dir,
-        field="velocity",
-    )
-    plot_float_field_histogram(
-        history=learner.history,
-        output_dir=output_dir,
-        field="velocity",
-        bins=50,
-    )
-    plot_field_history(
-        history=learner.history,
-        output_dir=output_dir,
-        field="states",
-    )
-    plot_values_histogram(
-        values=learner.state_strengths,
-        title="Strength histogram",
-        xlabel="Strength",
-        bins=50,
-        output_path=output_dir / "q_strength_histogram.png"
-    )
-    if animate:
-        SnakeAnimation(history=learner.best_game.history).save(
-            Path(output_dir) / f"snake_game.{animation_output_type}"
+        plot_window=plot_window,
+    ):
+        if animate:
+            SnakeAnimation(
+                history=learner.best_game.history,
+                max_frames=max_frames,
+                duration=animation_duration,
+            ).save(
+                Path(output_dir) / f"snake_game.{animation_output_type}",
+                raster=raster,
+            )
+        shutil.copyfile(configuration_file, output_dir / "configuration.json")
+        learner.save_q_to_file(
+            output_dir / f"q_values{Q_FILE_SUFFIXES[q_format]}",
+            q_format=q_format,
+            min_strength=min_state_strength,
+            percentile=state_strength_percentile,
+            top_k=top_states,
         )
-    shutil.copyfile(configuration_file, output_dir / "configuration.json")
-    with open(output_dir / "q_values.json", mode="w") as fd:
-        q_as_dict = {key: val.tolist() for key, val in learner.q.items()}
-        json.dump(q_as_dict, fd, indent=1)
 
 
 @snake.command("play")
@@ -231,12 +347,43 @@ def train_snake(
 @click.option("--rows", type=int, help="Override number of rows.")
 @click.option("--columns", type=int, help="Override number of columns.")
 @click.option("-b", "--best-of", type=int, help="Show best of n games")
+@click.option(
+    "-w", "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of processes playing best of n games",
+)
 @click.option(
     "--output-type",
     type=click.Choice(["gif", "mp4"], case_sensitive=False),
     default="gif"
 )
+@click.option(
+    "--raster/--no-raster",
+    default=False,
+    help="Paint animation frames directly instead of drawing them with matplotlib",
+)
+@click.option(
+    "--max-frames",
+    type=click.IntRange(min=1),
+    help="Skip uneventful moves to keep the animation under n frames",
+)
+@click.option(
+    "--animation-duration",
+    type=click.FloatRange(min=0, min_open=True),
+    help="Skip uneventful moves to keep the animation under n seconds",
+)
 @click.option("-e", "--epsilon", type=float, help="Override epsilon value.")
+@click.option(
+    "--profile/--no-profile",
+    default=False,
+    help="Report time spent in every phase of a move",
+)
+@click.option(
+    "--cprofile/--no-cprofile",
+    default=False,
+    help=f"Also dump cProfile statistics to {PSTATS_FILE} (requires --profile)",
+)
 def play_snake(
     q_file,
     configuration_file,
@@ -244,33 +391,59 @@ def play_snake(
     rows,
     columns,
     best_of,
+    workers,
     epsilon,
-    output_type
+    output_type,
+    raster,
+    max_frames,
+    animation_duration,
+    profile,
+    cprofile,
 ):
+    check_cprofile(profile, cprofile)
     with open(configuration_file, mode="r") as fd:
         configuration = json.load(fd)
-    view_getter = DistancesViewGetter(
-        sight_distance=configuration.pop("sight_distance", None)
-    )
+    view_getter = build_view_getter(configuration)
     extra_config = dict(rows=rows, columns=columns, epsilon=epsilon)
     extra_config = {
         key: value for key, value in extra_config.items() if value is not None
     }
     configuration.update(extra_config)
     learner = SnakeLearner(view_getter=view_getter, **configuration)
-    learner.load_q_from_file(q_file)
+    learner.load_q_from_file(q_file, lazy=True)
+    cprofiler = start_profile(learner, cprofile) if profile else None
     if best_of is None:
         board = learner.play()
     else:
         click.echo(f"Look for best game of {best_of} games")
-        boards = [learner.play() for _ in range(best_of)]
-        board = max(boards, key=lambda b: b.score)
+        seed, _ = play_best_of(
+            learner=learner, games_number=best_of, workers_number=workers
+        )
+        board = learner.play(seed=seed, update_q=False)
         click.echo(f"Found game with score {board.score}")
-    animation = SnakeAnimation(history=board.history)
+    if profile:
+        finish_profile(learner, output_dir, cprofiler)
+    animation = SnakeAnimation(
+        history=board.history, max_frames=max_frames, duration=animation_duration
+    )
     if output_dir is None:
         animation.play()
     else:
-        animation.save(Path(output_dir) / f"snake_game.{output_type}")
+        animation.save(
+            Path(output_dir) / f"snake_game.{output_type}", raster=raster
+        )
+
+
+@snake.command("convert-q")
+@click.argument("input_file", type=click.Path(exists=True, dir_okay=False))
+@click.argument("output_file", type=click.Path(dir_okay=False))
+@click.option(
+    "--q-format",
+    type=click.Choice([JSON_FORMAT, BINARY_FORMAT], case_sensitive=False),
+    help="Output format. Deduced from the output suffix by default.",
+)
+def convert_q(input_file, output_file, q_format):
+    convert_q_file(input_file, output_file, q_format=q_format)
 
 
 if __name__ == '__main__':
@@ -1,21 +1,30 @@
 import numpy as np
 from collections import deque
-from copy import deepcopy
 
-from snake_learner.direction import Direction
-from snake_learner.history import HistoryPoint
-from snake_learner.snake_action import SnakeAction
+from snake_learner.direction import DIRECTION_DELTAS, Direction
+from snake_learner.history import GameHistory
+from snake_learner.snake_action import DIRECTIONS, TURN_TABLE, SnakeAction
 
 
 class SnakeBoard:
 
-    def __init__(self, rows, columns, initial_size=3, max_moves_to_score=None):
+    def __init__(
+        self,
+        rows,
+        columns,
+        initial_size=3,
+        max_moves_to_score=None,
+        record_history=True,
+        random=None,
+    ):
+        self.random = random if random is not None else np.random.default_rng()
         self.shape = np.array([rows, columns])
         self.initial_size = initial_size
         self.max_moves_to_score = max_moves_to_score
+        self.record_history = record_history
         self.snake = []
         self.direction = None
-        self.history = []
+        self.history = GameHistory(shape=self.shape)
         self.moves = 0
         self.food = None
         self.initialize_snake()
@@ -27,7 +36,19 @@ class SnakeBoard:
 
     @snake.setter
     def snake(self, snake):
-        self._snake = deque([np.array(cell) for cell in snake])
+        self._snake = deque()
+        # Number of snake cells on each board cell. Cells may be counted
+        # more than once when the snake runs into itself.
+        self.grid = np.zeros(self.shape, dtype=np.uint8)
+        # Flat indices of empty cells. Cells are swap-removed, so
+        # free_position keeps the place of every cell in free_cells, and only
+        # the first free_count entries are free.
+        cells_number = int(self.shape[0] * self.shape[1])
+        self.free_cells = list(range(cells_number))
+        self.free_position = list(range(cells_number))
+        self.free_count = cells_number
+        for cell in snake:
+            self.push_head(np.array(cell))
 
     @property
     def head(self):
@@ -44,7 +65,11 @@ class SnakeBoard:
             and self.moves >= self.max_moves_to_score * self.score
         ):
             return True
-        return self.lost
+        return self.won or self.lost
+
+    @property
+    def won(self):
+        return self.free_count == 0
 
     @property
     def lost(self):
@@ -55,7 +80,7 @@ class SnakeBoard:
         self.direction = None
         self.moves = 0
         self.food = None
-        self.history = []
+        self.history = GameHistory(shape=self.shape)
         self.initialize_snake()
         self.put_random_food()
 
@@ -64,33 +89,62 @@ class SnakeBoard:
         self.move(self.direction)
 
     def move(self, direction: Direction):
+        if self.record_history and not self.history.started:
+            self.history.start(snake=self.snake, food=self.food)
         self.moves += 1
-        new_head = self.head + direction.to_array()
-        self.snake.append(new_head)
-        if np.array_equal(new_head, self.food):
+        new_head = self.head + DIRECTION_DELTAS[direction.value]
+        ate = np.array_equal(new_head, self.food)
+        if ate:
+            self.push_head(new_head)
             self.put_random_food()
         else:
-            self.snake.popleft()
-        self.history.append(
-            HistoryPoint(
-                shape=self.shape,
-                snake=list(deepcopy(self.snake)),
-                moves=self.moves,
-                food=deepcopy(self.food)
-            )
+            self.pop_tail()
+            self.push_head(new_head)
+        if self.record_history:
+            self.history.record(direction=direction, ate=ate, food=self.food)
+
+    def push_head(self, cell):
+        self.snake.append(cell)
+        if self.in_bounds(cell):
+            self.grid[cell[0], cell[1]] += 1
+            if self.grid[cell[0], cell[1]] == 1:
+                self.occupy_cell(cell[0] * self.shape[1] + cell[1])
+
+    def pop_tail(self):
+        cell = self.snake.popleft()
+        if self.in_bounds(cell):
+            self.grid[cell[0], cell[1]] -= 1
+            if self.grid[cell[0], cell[1]] == 0:
+                self.free_cell(cell[0] * self.shape[1] + cell[1])
+        return cell
+
+    def occupy_cell(self, flat_index):
+        self.free_count -= 1
+        self.swap_free_cells(self.free_position[flat_index], self.free_count)
+
+    def free_cell(self, flat_index):
+        self.swap_free_cells(self.free_position[flat_index], self.free_count)
+        self.free_count += 1
+
+    def swap_free_cells(self, position1, position2):
+        cell1, cell2 = self.free_cells[position1], self.free_cells[position2]
+        self.free_cells[position1], self.free_cells[position2] = cell2, cell1
+        self.free_position[cell1], self.free_position[cell2] = position2, position1
+
+    def in_bounds(self, location):
+        return (
+            0 <= location[0] < self.shape[0] and 0 <= location[1] < self.shape[1]
         )
 
     def is_valid_location(self, location, include_head=True):
-        if location[0] < 0 or location[0] >= self.shape[0]:
-            return False
-        if location[1] < 0 or location[1] >= self.shape[1]:
+        if not self.in_bounds(location):
             return False
         if self.location_in_snake(location, include_head=include_head):
             return False
         return True
 
     def initialize_snake(self):
-        self.snake.append(self.random_location())
+        self.push_head(self.random_location())
         self.direction = self.random_direction()
         while len(self.snake) < self.initial_size:
             actions = self.valid_actions()
@@ -98,40 +152,48 @@ class SnakeBoard:
                 self.snake = [self.random_location()]
                 self.direction = self.random_direction()
                 continue
-            action = np.random.choice(actions)
+            action = actions[self.random.integers(len(actions))]
             self.direction = action.turn(self.direction)
-            self.snake.append(self.head + self.direction.to_array())
+            self.push_head(self.head + self.direction.to_array())
 
     def valid_actions(self):
+        new_directions = TURN_TABLE[self.direction.value]
         return [
             action for action in SnakeAction
             if self.is_valid_location(
-                self.head + action.turn(self.direction).to_array()
+                self.head + DIRECTION_DELTAS[new_directions[action.value]]
             )
         ]
 
     def put_random_food(self):
-        self.food = self.random_location()
-        while self.location_in_snake(self.food):
-            self.food = self.random_location()
+        if self.free_count == 0:
+            self.food = None
+            return
+        flat_index = self.free_cells[self.random.integers(self.free_count)]
+        self.food = np.array(divmod(flat_index, int(self.shape[1])))
 
     def random_location(self):
         return np.array(
             [
-                np.random.randint(self.shape[0]),
-                np.random.randint(self.shape[1]),
+                self.random.integers(self.shape[0]),
+                self.random.integers(self.shape[1]),
             ]
         )
 
-    @classmethod
-    def random_direction(cls):
-        return np.random.choice(Direction)
+    def random_direction(self):
+        return DIRECTIONS[self.random.integers(len(Direction))]
 
     def location_in_snake(self, location, include_head=True):
-        snake_cells = list(self.snake)
-        if not include_head:
-            snake_cells = snake_cells[:-1]
-        for snake_cell in snake_cells:
-            if np.array_equal(snake_cell, location):
-                return True
-        return False
+        if not self.in_bounds(location):
+            # Only a snake that already left the board has cells outside of
+            # it, so the rare out of bounds query falls back to a scan.
+            snake_cells = list(self.snake)
+            if not include_head:
+                snake_cells = snake_cells[:-1]
+            return any(
+                np.array_equal(snake_cell, location) for snake_cell in snake_cells
+            )
+        count = self.grid[location[0], location[1]]
+        if not include_head and np.array_equal(self.head, location):
+            count -= 1
+        return count > 0
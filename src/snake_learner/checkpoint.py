@@ -0,0 +1,241 @@
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from snake_learner.q_file import BINARY_FORMAT, load_q_items, save_q
+from snake_learner.snake_action import SnakeAction
+
+Q_BASE_FILE = "q_base.qbin"
+HISTORY_BASE_FILE = "history_base.jsonl"
+DELTAS_FILE = "deltas.jsonl"
+
+
+class Checkpointer:
+
+    # Every checkpoint appends the Q rows changed since the previous one, the
+    # removed states and the new history points to a delta log. The Q table
+    # tracks its changed rows, so a checkpoint costs the size of the changes.
+    # Serialization and writing happen on a background thread, and the log
+    # is periodically compacted into the base files.
+
+    def __init__(
+        self,
+        learner,
+        directory,
+        every_iterations=None,
+        every_seconds=None,
+        compact_every=10,
+        resume_sequence=None,
+    ):
+        self.learner = learner
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.every_iterations = every_iterations
+        self.every_seconds = every_seconds
+        self.compact_every = compact_every
+        learner.q.track_changes()
+        if resume_sequence is None:
+            clear_checkpoint(self.directory)
+            self.sequence = 0
+            # States learned before the first checkpoint are part of it.
+            learner.q.mark_changed(learner.q.live_ids().tolist())
+            self.history_length = 0
+        else:
+            self.sequence = resume_sequence
+            self.history_length = len(learner.history)
+        self.iterations = 0
+        self.last_time = time.monotonic()
+        self.deltas_number = 0
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.write_deltas, daemon=True)
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def update(self, iterations):
+        self.iterations += iterations
+        if (
+            self.every_iterations is not None
+            and self.iterations >= self.every_iterations
+        ) or (
+            self.every_seconds is not None
+            and time.monotonic() - self.last_time >= self.every_seconds
+        ):
+            self.checkpoint()
+
+    def checkpoint(self):
+        q = self.learner.q
+        changed_ids, removed_states = q.take_changes()
+        states = [q.states[state_id] for state_id in changed_ids]
+        values = q.values[changed_ids]
+        history = [
+            self.learner.history[i]
+            for i in range(self.history_length, len(self.learner.history))
+        ]
+        self.history_length = len(self.learner.history)
+        self.iterations = 0
+        self.last_time = time.monotonic()
+        self.sequence += 1
+        self.queue.put((self.sequence, states, values, removed_states, history))
+
+    def close(self):
+        self.checkpoint()
+        self.queue.put(None)
+        self.thread.join()
+        compact_checkpoint(self.directory)
+
+    def write_deltas(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            sequence, states, values, removed_states, history = item
+            append_line(
+                self.directory / DELTAS_FILE,
+                json.dumps(
+                    dict(
+                        sequence=sequence,
+                        states=dict(zip(states, values.tolist())),
+                        removed=removed_states,
+                        history=history,
+                    ),
+                    default=to_builtin,
+                ),
+            )
+            self.deltas_number += 1
+            if self.deltas_number % self.compact_every == 0:
+                compact_checkpoint(self.directory)
+
+
+def append_line(path, line):
+    with open(path, mode="a+b") as fd:
+        # A write interrupted earlier leaves a partial last line, which is
+        # ended so that it does not swallow the appended one.
+        if fd.seek(0, os.SEEK_END) != 0:
+            fd.seek(-1, os.SEEK_END)
+            if fd.read(1) != b"\n":
+                fd.write(b"\n")
+        fd.write(line.encode() + b"\n")
+
+
+def read_lines(path):
+    if not path.exists():
+        return
+    with open(path, mode="r") as fd:
+        for line in fd:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # Left by a write that was interrupted.
+                continue
+
+
+def to_builtin(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def has_checkpoint(directory):
+    directory = Path(directory)
+    return (directory / HISTORY_BASE_FILE).exists() or (
+        directory / DELTAS_FILE
+    ).exists()
+
+
+def clear_checkpoint(directory):
+    for file_name in [Q_BASE_FILE, HISTORY_BASE_FILE, DELTAS_FILE]:
+        (Path(directory) / file_name).unlink(missing_ok=True)
+
+
+def load_checkpoint(directory):
+    directory = Path(directory)
+    q_values = load_q_base(directory)
+    history, sequence = load_history_base(directory)
+    for delta in load_deltas(directory, sequence):
+        apply_delta(q_values, delta)
+        history.extend(delta["history"])
+        sequence = delta["sequence"]
+    return q_values, history, sequence
+
+
+def load_q_base(directory):
+    if not (directory / Q_BASE_FILE).exists():
+        return {}
+    return {
+        state: np.array(value)
+        for state, value in load_q_items(directory / Q_BASE_FILE)
+    }
+
+
+def load_history_base(directory):
+    # The history base has a line for every compaction, holding the history
+    # points it added and the sequence number of the last delta it covers.
+    history, sequence = [], 0
+    for history_part in read_lines(directory / HISTORY_BASE_FILE):
+        history.extend(history_part["history"])
+        sequence = history_part["sequence"]
+    return history, sequence
+
+
+def load_deltas(directory, sequence):
+    for delta in read_lines(directory / DELTAS_FILE):
+        # Deltas older than the base were left by a compaction that stopped
+        # before removing the log.
+        if delta["sequence"] > sequence:
+            yield delta
+
+
+def apply_delta(q_values, delta):
+    for state in delta.get("removed", []):
+        q_values.pop(parse_logged_state(state), None)
+    for state, value in delta["states"].items():
+        q_values[parse_logged_state(state)] = np.array(value)
+
+
+def parse_logged_state(state):
+    # JSON turns integer keys to strings
+    return int(state) if state.isdigit() else state
+
+
+def compact_checkpoint(directory):
+    directory = Path(directory)
+    q_values = load_q_base(directory)
+    _, sequence = load_history_base(directory)
+    history, deltas_number = [], 0
+    for delta in load_deltas(directory, sequence):
+        apply_delta(q_values, delta)
+        history.extend(delta["history"])
+        sequence = delta["sequence"]
+        deltas_number += 1
+    if deltas_number == 0:
+        (directory / DELTAS_FILE).unlink(missing_ok=True)
+        return
+    states = list(q_values.keys())
+    values = np.array(list(q_values.values()), dtype=float).reshape(
+        len(states), len(SnakeAction)
+    )
+    save_q(
+        states=states,
+        values=values,
+        path=directory / f"{Q_BASE_FILE}.tmp",
+        q_format=BINARY_FORMAT,
+    )
+    (directory / f"{Q_BASE_FILE}.tmp").replace(directory / Q_BASE_FILE)
+    # Only the history of the compacted deltas is appended. The history base
+    # holds the sequence number, so it is written after the Q base and before
+    # the log is removed.
+    append_line(
+        directory / HISTORY_BASE_FILE,
+        json.dumps(dict(sequence=sequence, history=history), default=to_builtin),
+    )
+    (directory / DELTAS_FILE).unlink(missing_ok=True)
@@ -1,13 +1,17 @@
-from enum import Enum, auto
+from enum import Enum
 import numpy as np
 
 
-TO_ARRAY = {
-    "UP": np.array([1, 0]),
-    "DOWN": np.array([-1, 0]),
-    "RIGHT": np.array([0, 1]),
-    "LEFT": np.array([0, -1]),
-}
+# Row i is the step taken by the direction whose value is i.
+DIRECTION_DELTAS = np.array(
+    [
+        [1, 0],
+        [0, 1],
+        [-1, 0],
+        [0, -1],
+    ]
+)
+DIRECTION_DELTAS.setflags(write=False)
 
 
 class Direction(Enum):
@@ -17,4 +21,4 @@ class Direction(Enum):
     LEFT = 3
 
     def to_array(self):
-        return TO_ARRAY[self.name]
+        return DIRECTION_DELTAS[self.value]
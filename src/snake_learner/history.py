@@ -1,8 +1,14 @@
+from array import array
+from collections import deque
+from collections.abc import Sequence
 from dataclasses import dataclass
+from pathlib import Path
 from typing import List
 
 import numpy as np
 
+from snake_learner.direction import DIRECTION_DELTAS, Direction
+
 
 @dataclass
 class HistoryPoint:
@@ -19,3 +25,161 @@ class HistoryPoint:
     @property
     def head(self):
         return self.snake[-1]
+
+
+class GameHistory(Sequence):
+
+    def __init__(self, shape):
+        self.shape = shape
+        self.initial_snake = None
+        self.initial_food = None
+        # Each move is stored as the direction value, plus len(Direction) if
+        # the snake ate on that move. Food placed after eating is kept apart.
+        self.move_codes = array("B")
+        self.food_changes = []
+        self._reset_cursor()
+
+    @property
+    def started(self):
+        return self.initial_snake is not None
+
+    def start(self, snake, food):
+        self.initial_snake = list(snake)
+        self.initial_food = None if food is None else np.array(food)
+        self._reset_cursor()
+
+    def record(self, direction: Direction, ate, food):
+        self.move_codes.append(direction.value + (len(Direction) if ate else 0))
+        if ate:
+            self.food_changes.append(None if food is None else np.array(food))
+
+    def __len__(self):
+        return len(self.move_codes)
+
+    def eat_indices(self):
+        codes = np.frombuffer(self.move_codes, dtype=np.uint8)
+        return np.flatnonzero(codes >= len(Direction))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError("GameHistory index out of range")
+        if index < self._cursor_index:
+            self._reset_cursor()
+        while self._cursor_index < index:
+            self._advance_cursor()
+        return HistoryPoint(
+            shape=self.shape,
+            snake=list(self._cursor_snake),
+            moves=index + 1,
+            food=self._cursor_food,
+        )
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def _reset_cursor(self):
+        self._cursor_index = -1
+        self._cursor_snake = deque(self.initial_snake or [])
+        self._cursor_food = self.initial_food
+        self._cursor_food_index = 0
+
+    def _advance_cursor(self):
+        self._cursor_index += 1
+        ate, direction_value = divmod(
+            self.move_codes[self._cursor_index], len(Direction)
+        )
+        self._cursor_snake.append(
+            self._cursor_snake[-1] + DIRECTION_DELTAS[direction_value]
+        )
+        if ate:
+            self._cursor_food = self.food_changes[self._cursor_food_index]
+            self._cursor_food_index += 1
+        else:
+            self._cursor_snake.popleft()
+
+
+class EpisodeHistory(Sequence):
+
+    # Training history kept as one typed column per field. Columns can be
+    # memory mapped files in a directory for runs too long to keep in memory.
+
+    FIELDS = dict(
+        score=np.int64,
+        duration=np.int64,
+        rewards=np.float64,
+        states=np.int64,
+        velocity=np.float64,
+    )
+
+    def __init__(self, initial_capacity=1_024, directory=None):
+        self.directory = None if directory is None else Path(directory)
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self.length = 0
+        self.capacity = 0
+        self.columns = {}
+        self.resize(initial_capacity)
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError("EpisodeHistory index out of range")
+        return {field: column[index].item() for field, column in self.columns.items()}
+
+    def __getstate__(self):
+        return dict(
+            columns={field: np.array(self.column(field)) for field in self.FIELDS},
+        )
+
+    def __setstate__(self, state):
+        self.__init__(initial_capacity=max(len(state["columns"]["score"]), 1))
+        for field, column in state["columns"].items():
+            self.columns[field][:len(column)] = column
+        self.length = len(state["columns"]["score"])
+
+    def column(self, field):
+        return self.columns[field][:self.length]
+
+    def append(self, history_point):
+        if self.length == self.capacity:
+            self.resize(2 * self.capacity)
+        for field, column in self.columns.items():
+            column[self.length] = history_point[field]
+        self.length += 1
+
+    def extend(self, history_points):
+        for history_point in history_points:
+            self.append(history_point)
+
+    def resize(self, capacity):
+        for field, dtype in self.FIELDS.items():
+            if self.directory is not None:
+                self.columns[field] = self.map_column(field, dtype, capacity)
+                continue
+            column = np.zeros(capacity, dtype=dtype)
+            if field in self.columns:
+                column[:self.length] = self.column(field)
+            self.columns[field] = column
+        self.capacity = capacity
+
+    def map_column(self, field, dtype, capacity):
+        path = self.directory / f"{field}.bin"
+        if field in self.columns:
+            self.columns[field].flush()
+            del self.columns[field]
+        mode = "r+" if self.capacity else "w+"
+        if mode == "r+":
+            with open(path, mode="r+b") as fd:
+                fd.truncate(capacity * np.dtype(dtype).itemsize)
+        return np.memmap(path, mode=mode, dtype=dtype, shape=(capacity,))
@@ -1,11 +1,18 @@
-import json
-from collections import defaultdict
+from time import perf_counter_ns
 
 import numpy as np
 
 from snake_learner.board import SnakeBoard
+from snake_learner.history import EpisodeHistory
+from snake_learner.q_file import BINARY_FORMAT, LazyQTable, MappedQFile, \
+    load_q_items, q_file_format, save_q
+from snake_learner.q_table import BoundedQTable, QTable, strength_mask
+from snake_learner.replay import TERMINAL_STATE, ReplayBuffer
 from snake_learner.snake_action import SnakeAction
 from snake_learner.linalg_util import block_distance
+from snake_learner.stat_util import RollingStatistics, UniformBuffer
+
+HISTORY_FIELDS = ["score", "duration", "rewards", "states", "velocity"]
 
 
 class SnakeLearner:
@@ -25,12 +32,21 @@ class SnakeLearner:
         eat_reward,
         move_reward,
         max_moves_to_score=None,
+        record_history=True,
+        statistics_window=1_000,
+        history_dir=None,
+        replay_buffer_size=None,
+        replay_batch_size=32,
+        replay_prioritized=False,
+        seed=None,
+        max_states=None,
     ):
         self.rows = rows
         self.columns = columns
         self.max_moves_to_score = max_moves_to_score
+        self.record_history = record_history
         self.view_getter = view_getter
-        self.q = defaultdict(lambda: np.zeros(len(SnakeAction)))
+        self.q = QTable() if max_states is None else BoundedQTable(max_states)
 
         self.discount_factor = discount_factor
         self.alpha = alpha
@@ -42,8 +58,27 @@ class SnakeLearner:
         self.loss_penalty = loss_penalty
         self.move_reward = move_reward
 
-        self.history = []
+        self.history = EpisodeHistory(directory=history_dir)
+        self.statistics_window = statistics_window
+        self.statistics = {
+            field: RollingStatistics(window=statistics_window)
+            for field in HISTORY_FIELDS
+        }
         self.best_game = None
+        self.replay_buffer = None
+        if replay_buffer_size is not None:
+            self.replay_buffer = ReplayBuffer(
+                capacity=replay_buffer_size, prioritized=replay_prioritized
+            )
+            if max_states is not None:
+                self.q.eviction_callbacks.append(
+                    self.replay_buffer.discard_states
+                )
+        self.replay_batch_size = replay_batch_size
+        self.replay_steps = 0
+        self.seed_random(seed)
+        self.profiler = None
+        self._cached_view = (None, None, None)
 
     @property
     def max_score(self):
@@ -63,7 +98,7 @@ class SnakeLearner:
 
     @property
     def state_strengths(self):
-        return [self.state_strength(state) for state in self.q.keys()]
+        return self.q.strengths()
 
     def recent_scores_mean(self, n=1_000):
         return self.recent_field_mean(field="score", n=n)
@@ -75,38 +110,80 @@ class SnakeLearner:
         return self.recent_field_mean(field="duration", n=n)
 
     def field_max(self, field):
-        if len(self.history) == 0:
-            return None
-        return np.max([history_point[field] for history_point in self.history])
+        return self.statistics[field].max
 
     def recent_field_mean(self, field, n):
+        if n == self.statistics_window:
+            return self.statistics[field].mean
         if len(self.history) == 0:
             return None
-        history = self.history
-        if len(history) > n:
-            history = history[-n:]
-        return np.mean([history_point[field] for history_point in history])
-
-    def load_q_from_file(self, q_file_path):
-        with open(q_file_path, mode="r") as fd:
-            new_q = json.load(fd)
-        self.q.update({key: np.array(val) for key, val in new_q.items()})
-
-    def clear_states_by_strength(self, min_strength):
-        strong_states = [
-            state for state in self.q.keys()
-            if self.state_strength(state) > min_strength
-        ]
-        self.q = {
-            state: state_value for state, state_value in self.q.items()
-            if state in strong_states
-        }
+        return np.mean(self.history.column(field)[-n:])
+
+    def load_q_from_file(self, q_file_path, lazy=False):
+        if q_file_format(q_file_path) == BINARY_FORMAT:
+            q_file = MappedQFile(q_file_path)
+            if q_file.key_type is self.view_getter.key_type:
+                if lazy:
+                    self.q = LazyQTable(q_file)
+                else:
+                    # Keys are already states, so no key needs parsing.
+                    self.q.update_rows(q_file.states, q_file.values)
+                return
+        self.q.update(
+            {
+                self.view_getter.parse_key(str(key)): val
+                for key, val in load_q_items(q_file_path)
+            }
+        )
+
+    def save_q_to_file(
+        self,
+        q_file_path,
+        q_format=None,
+        min_strength=None,
+        percentile=None,
+        top_k=None,
+    ):
+        # Weak states are filtered out on the way to the file, the table
+        # itself is left untouched.
+        mask = None
+        if min_strength is not None or percentile is not None or top_k is not None:
+            mask = strength_mask(
+                self.q.strengths(),
+                min_strength=min_strength,
+                percentile=percentile,
+                top_k=top_k,
+            )
+        states, values = self.q.export(mask)
+        save_q(
+            states=states,
+            values=values,
+            path=q_file_path,
+            q_format=q_format,
+        )
+
+    def clear_states_by_strength(
+        self, min_strength=None, percentile=None, top_k=None
+    ):
+        self.q.clear_by_strength(
+            min_strength=min_strength, percentile=percentile, top_k=top_k
+        )
+
+    def seed_random(self, seed):
+        # A single generator drives both the policy and the boards, so a seed
+        # reproduces a whole run.
+        self.random = np.random.default_rng(seed)
+        self.uniforms = UniformBuffer(self.random)
+        if self.replay_buffer is not None:
+            self.replay_buffer.random = self.random
 
     def build_board(self):
         return SnakeBoard(
             rows=self.rows,
             columns=self.columns,
             max_moves_to_score=self.max_moves_to_score,
+            record_history=self.record_history,
+            random=self.random,
         )
 
     def run_train_iteration(self):
@@ -119,7 +196,8 @@ class SnakeLearner:
             # done is True if episode terminated
             if board.done:
                 break
-        self.history.append(
+        start_ns = perf_counter_ns() if self.profiler is not None else None
+        self.add_history_point(
             dict(
                 score=board.score,
                 duration=board.moves,
@@ -128,36 +206,105 @@ class SnakeLearner:
                 velocity=board.score / board.moves,
             )
         )
+        self.update_best_game(board)
+        if self.profiler is not None:
+            self.profiler.add("history", start_ns)
+            self.profiler.episodes += 1
+
+    def add_history_point(self, history_point):
+        self.history.append(history_point)
+        for field in HISTORY_FIELDS:
+            self.statistics[field].add(history_point[field])
+
+    def update_best_game(self, board):
         if self.best_game is None or board.score > self.best_game.score:
             self.best_game = board
 
-    def play(self):
+    def play(self, seed=None, update_q=True):
+        if seed is not None:
+            self.seed_random(seed)
         board = self.build_board()
         while not board.done:
-            self.make_move(board)
+            self.make_move(board, update_q=update_q)
+        if self.profiler is not None:
+            self.profiler.episodes += 1
         return board
 
     def make_move(self, board, update_q=True):
-        # get probabilities of all actions from current state
-        state = self.view_getter.get_view(board)
-        action_probabilities = self.get_policy(state)
-        # choose action according to
-        # the probability distribution
-        action_index = np.random.choice(
-            np.arange(len(SnakeAction)),
-            p=action_probabilities,
-        )
+        if self.profiler is not None:
+            return self.make_profiled_move(board, update_q)
+        state = self.get_view(board)
+        action_index = self.choose_action(state)
         # take action and get reward, transit to next state
-        reward = self.run_step(
-            board=board, action=SnakeAction(action_index)
-        )
+        reward = self.run_step(board=board, action=SnakeAction(action_index))
+        if update_q:
+            self.update_q(state, action_index, reward, board)
+        return reward
 
+    def make_profiled_move(self, board, update_q):
+        profiler = self.profiler
+        start_ns = perf_counter_ns()
+        state = self.get_view(board)
+        start_ns = profiler.add("view", start_ns)
+        action_index = self.choose_action(state)
+        start_ns = profiler.add("policy", start_ns)
+        initial_score = board.score
+        board.turn(SnakeAction(action_index))
+        start_ns = profiler.add("step", start_ns)
+        reward = self.get_reward(board, initial_score)
+        start_ns = profiler.add("reward", start_ns)
         if update_q:
-            td_target = reward + self.discount_factor * self.best_reward(board)
-            td_delta = td_target - self.q[state][action_index]
-            self.q[state][action_index] += self.alpha * td_delta
+            if not board.done:
+                # Warm the view cache so the next state view is not timed as
+                # part of the Q update.
+                self.get_view(board)
+                start_ns = profiler.add("view", start_ns)
+            self.update_q(state, action_index, reward, board)
+            profiler.add("q_update", start_ns)
+        profiler.steps += 1
         return reward
 
+    def choose_action(self, state):
+        # epsilon greedy choice, same distribution as get_policy
+        if self.uniforms.next() < self.epsilon:
+            return int(self.uniforms.next() * len(SnakeAction))
+        return int(np.argmax(self.q[state]))
+
+    def update_q(self, state, action_index, reward, board):
+        if self.replay_buffer is not None:
+            self.add_transition(state, action_index, reward, board)
+            return
+        td_target = reward + self.discount_factor * self.best_reward(board)
+        td_delta = td_target - self.q[state][action_index]
+        self.q[state][action_index] += self.alpha * td_delta
+
+    def add_transition(self, state, action_index, reward, board):
+        state_id = self.q.state_id(state)
+        next_state_id = (
+            TERMINAL_STATE if board.done
+            else self.q.state_id(self.get_view(board))
+        )
+        self.replay_buffer.add(state_id, action_index, reward, next_state_id)
+        self.replay_steps += 1
+        if self.replay_steps % self.replay_batch_size == 0:
+            updated_states = self.replay_buffer.update_q(
+                values=self.q.all_values,
+                batch_size=self.replay_batch_size,
+                alpha=self.alpha,
+                discount_factor=self.discount_factor,
+            )
+            self.q.mark_changed(updated_states.tolist())
+
+    def get_view(self, board):
+        # The view of the state reached by a move is needed both for the TD
+        # target and for choosing the next move, so the last one is kept.
+        cached_board, cached_moves, cached_view = self._cached_view
+        if cached_board is board and cached_moves == board.moves:
+            return cached_view
+        view = self.view_getter.get_view(board)
+        self._cached_view = (board, board.moves, view)
+        return view
+
     def get_policy(self, state):
         action_probabilities = np.ones(
             len(SnakeAction), dtype=float
@@ -169,9 +316,10 @@ class SnakeLearner:
 
     def run_step(self, board, action):
         initial_score = board.score
-
         board.turn(action)
+        return self.get_reward(board, initial_score)
 
+    def get_reward(self, board, initial_score):
         new_score = board.score
         if new_score > initial_score:
             return self.eat_reward * np.exp(self.reward_change * new_score)
@@ -184,7 +332,7 @@ class SnakeLearner:
     def best_reward(self, board):
         if board.done:
             return 0
-        state = self.view_getter.get_view(board)
+        state = self.get_view(board)
         best_next_action = np.argmax(self.q[state])
         return self.q[state][best_next_action]
 
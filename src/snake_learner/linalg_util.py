@@ -1,7 +1,18 @@
 import numpy as np
 
-from snake_learner.direction import Direction
-from snake_learner.snake_action import SnakeAction
+from snake_learner.direction import DIRECTION_DELTAS, Direction
+from snake_learner.snake_action import SnakeAction, TURN_TABLE
+
+# PROJECTIONS[direction value] maps a vector to its components along the
+# direction and along the direction to its right.
+PROJECTIONS = np.stack(
+    [
+        DIRECTION_DELTAS,
+        DIRECTION_DELTAS[TURN_TABLE[:, SnakeAction.TURN_RIGHT.value]],
+    ],
+    axis=1,
+)
+PROJECTIONS.setflags(write=False)
 
 
 def block_distance(sight_vector):
@@ -9,17 +20,12 @@ def block_distance(sight_vector):
 
 
 def closest_direction(sight_vector):
-    multiplications = [
-        cosine_multiplication(sight_vector, direction.to_array())
-        for direction in Direction
-    ]
+    multiplications = DIRECTION_DELTAS @ sight_vector / np.linalg.norm(sight_vector)
     return Direction(np.argmax(multiplications))
 
 
 def project_to_direction(sight_vector: np.ndarray, direction: Direction):
-    a1 = np.dot(sight_vector, direction.to_array())
-    a2 = np.dot(sight_vector, SnakeAction.TURN_RIGHT.turn(direction).to_array())
-    return np.array([a1, a2])
+    return PROJECTIONS[direction.value] @ sight_vector
 
 
 def cosine_multiplication(vec1, vec2):
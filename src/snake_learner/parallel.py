@@ -0,0 +1,186 @@
+import copy
+import multiprocessing
+import signal
+
+import numpy as np
+
+from snake_learner.history import EpisodeHistory
+
+# Learner of a best of n play worker, set once when the pool starts.
+play_worker_learner = None
+
+
+class ParallelTrainer:
+
+    def __init__(self, learner, workers_number, sync_iterations=100):
+        # Rounds of no iterations would never finish training.
+        if workers_number < 1:
+            raise ValueError("workers_number must be at least 1")
+        if sync_iterations < 1:
+            raise ValueError("sync_iterations must be at least 1")
+        self.learner = learner
+        self.workers_number = workers_number
+        self.sync_iterations = sync_iterations
+        self.connections = []
+        self.processes = []
+        # Merged values that workers did not see yet, sent with the next round.
+        self.pending_states = []
+        self.pending_values = np.zeros((0, learner.q.values.shape[1]))
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def start(self):
+        worker_learner = copy.copy(self.learner)
+        worker_learner.history = EpisodeHistory()
+        worker_learner.best_game = None
+        seeds = self.learner.random.integers(2 ** 32, size=self.workers_number)
+        for seed in seeds:
+            connection, worker_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=run_worker,
+                args=(worker_connection, worker_learner, seed),
+                daemon=True,
+            )
+            process.start()
+            worker_connection.close()
+            self.connections.append(connection)
+            self.processes.append(process)
+
+    def stop(self):
+        for connection in self.connections:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            connection.close()
+        for process in self.processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+        self.connections = []
+        self.processes = []
+
+    def train(self, iterations):
+        while iterations > 0:
+            round_iterations = min(iterations, self.workers_number * self.sync_iterations)
+            completed = self.run_round(round_iterations)
+            iterations -= completed
+            yield completed
+
+    def run_round(self, iterations):
+        worker_iterations = np.full(
+            self.workers_number, iterations // self.workers_number
+        )
+        worker_iterations[:iterations % self.workers_number] += 1
+        active_connections = []
+        for connection, connection_iterations in zip(
+            self.connections, worker_iterations
+        ):
+            if connection_iterations == 0:
+                continue
+            connection.send(
+                (int(connection_iterations), self.pending_states, self.pending_values)
+            )
+            active_connections.append(connection)
+        results = [connection.recv() for connection in active_connections]
+        self.merge(results)
+        return iterations
+
+    def merge(self, results):
+        q = self.learner.q
+        state_ids, deltas = [], []
+        for states, worker_deltas, _, _, _ in results:
+            state_ids.extend(q.state_id(state) for state in states)
+            deltas.append(worker_deltas)
+        state_ids = np.array(state_ids, dtype=int)
+        deltas = np.concatenate(
+            [np.zeros((0, q.values.shape[1]))] + deltas
+        )
+        # Every state moves by the mean of the deltas of the workers that
+        # visited it during the round.
+        merged_ids, inverse = np.unique(state_ids, return_inverse=True)
+        delta_sums = np.zeros((len(merged_ids), q.values.shape[1]))
+        np.add.at(delta_sums, inverse, deltas)
+        counts = np.bincount(inverse, minlength=len(merged_ids))
+        q.values[merged_ids] += delta_sums / counts[:, np.newaxis]
+        self.pending_states = [q.states[state_id] for state_id in merged_ids]
+        self.pending_values = q.values[merged_ids].copy()
+
+        for _, _, history, best_game, profiler in results:
+            if profiler is not None:
+                self.learner.profiler.merge(profiler)
+            for history_point in history:
+                history_point["states"] = self.learner.states_number
+                self.learner.add_history_point(history_point)
+            if best_game is not None:
+                self.learner.update_best_game(best_game)
+
+
+def run_worker(connection, learner, seed):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    learner.seed_random(seed)
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        iterations, states, values = message
+        for state, value in zip(states, values):
+            learner.q[state] = value
+        snapshot = learner.q.snapshot()
+        learner.history = EpisodeHistory()
+        learner.best_game = None
+        if learner.profiler is not None:
+            learner.profiler.reset()
+        for _ in range(iterations):
+            learner.run_train_iteration()
+        changed_ids, deltas = learner.q.changes_since(snapshot)
+        connection.send(
+            (
+                [learner.q.states[state_id] for state_id in changed_ids],
+                deltas,
+                learner.history,
+                learner.best_game,
+                learner.profiler,
+            )
+        )
+    connection.close()
+
+
+def play_best_of(learner, games_number, workers_number=1):
+    # Games are played without Q updates and only their scores come back, so
+    # the best game can be replayed from its seed with learner.play.
+    seeds = learner.random.integers(2 ** 32, size=games_number).tolist()
+    player = copy.copy(learner)
+    player.record_history = False
+    if workers_number <= 1:
+        scores = [play_score(player, seed) for seed in seeds]
+    else:
+        with multiprocessing.Pool(
+            workers_number, initializer=init_play_worker, initargs=(player,)
+        ) as pool:
+            scores = pool.map(
+                play_worker_score,
+                seeds,
+                chunksize=max(1, games_number // (4 * workers_number)),
+            )
+    best_index = int(np.argmax(scores))
+    return seeds[best_index], scores[best_index]
+
+
+def play_score(learner, seed):
+    return learner.play(seed=seed, update_q=False).score
+
+
+def init_play_worker(learner):
+    global play_worker_learner
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    play_worker_learner = learner
+
+
+def play_worker_score(seed):
+    return play_score(play_worker_learner, seed)
@@ -1,11 +1,20 @@
 import numpy as np
 from matplotlib import pyplot as plt
 
-from snake_learner.stat_util import moving_max, moving_mean
+from snake_learner.history import EpisodeHistory
+from snake_learner.stat_util import decimate, moving_max, moving_mean
+
+MAX_PLOT_POINTS = 10_000
+
+
+def field_values(history, field):
+    if isinstance(history, EpisodeHistory):
+        return history.column(field)
+    return [history_point[field] for history_point in history]
 
 
 def plot_values_history(values, title, xlabel, ylabel, output_path):
-    x = np.arange(np.array(values).shape[0])
+    x, values = decimate(values, max_points=MAX_PLOT_POINTS)
     fig, ax = plt.subplots()
 
     ax.plot(x, values)
@@ -13,6 +22,7 @@ def plot_values_history(values, title, xlabel, ylabel, output_path):
     ax.set_xlabel(xlabel)
     ax.set_ylabel(ylabel)
     fig.savefig(output_path)
+    plt.close(fig)
 
 
 def plot_values_histogram(values, title, xlabel, bins, output_path):
@@ -22,12 +32,13 @@ def plot_values_histogram(values, title, xlabel, bins, output_path):
     ax.set_xlabel(xlabel)
     ax.set_ylabel("Count")
     fig.savefig(output_path)
+    plt.close(fig)
 
 
 def plot_field_history(history, output_dir, field):
     field_title = field.replace("_", " ").title()
     plot_values_history(
-        values=[history_point[field] for history_point in history],
+        values=field_values(history, field),
         title=f"{field_title} History",
         xlabel="Time",
         ylabel=field_title,
@@ -38,7 +49,7 @@ def plot_field_history(history, output_dir, field):
 def plot_max_field_history(history, output_dir, field):
     field_title = field.replace("_", " ").title()
     plot_values_history(
-        values=moving_max([history_point[field] for history_point in history]),
+        values=moving_max(field_values(history, field)),
         title=f"Max {field_title} History",
         xlabel="Time",
         ylabel=field_title,
@@ -49,7 +60,7 @@ def plot_max_field_history(history, output_dir, field):
 def plot_recent_mean_field_history(history, output_dir, field, n):
     field_title = field.replace("_", " ").title()
     plot_values_history(
-        values=moving_mean([history_point[field] for history_point in history], n=n),
+        values=moving_mean(field_values(history, field), n=n),
         title=f"{field_title} Recent Mean History (Window Size={n})",
         xlabel="Time",
         ylabel=field_title,
@@ -58,7 +69,7 @@ def plot_recent_mean_field_history(history, output_dir, field, n):
 
 
 def plot_int_field_histogram(history, output_dir, field):
-    values = [history_point[field] for history_point in history]
+    values = field_values(history, field)
     mean_value, std_value = np.mean(values), np.std(values)
     unique, counts = np.unique(values, return_counts=True)
     fig, ax = plt.subplots()
@@ -71,12 +82,13 @@ def plot_int_field_histogram(history, output_dir, field):
     ax.set_xlabel(field_title)
     ax.set_ylabel("Count")
     fig.savefig(output_dir / f"{field}_histogram.png")
+    plt.close(fig)
 
 
 def plot_float_field_histogram(history, output_dir, field, bins):
     field_title = field.replace("_", " ").title()
     plot_values_histogram(
-        values=[history_point[field] for history_point in history],
+        values=field_values(history, field),
         title=f"{field_title} Histogram",
         xlabel=field_title,
         output_path=output_dir / f"{field}_histogram.png",
@@ -0,0 +1,86 @@
+import cProfile
+import json
+from time import perf_counter_ns
+
+PHASES = ["view", "policy", "step", "reward", "q_update", "history"]
+PROFILE_FILE = "profile.json"
+PSTATS_FILE = "profile.pstats"
+
+
+class Profiler:
+
+    # Phase counters are plain integer sums of perf_counter_ns differences,
+    # so instrumented code pays two clock reads per phase.
+
+    def __init__(self):
+        self.phase_ns = dict.fromkeys(PHASES, 0)
+        self.steps = 0
+        self.episodes = 0
+        self.start_ns = perf_counter_ns()
+        self.stop_ns = None
+
+    def add(self, phase, start_ns):
+        end_ns = perf_counter_ns()
+        self.phase_ns[phase] += end_ns - start_ns
+        return end_ns
+
+    def merge(self, other):
+        for phase, duration in other.phase_ns.items():
+            self.phase_ns[phase] += duration
+        self.steps += other.steps
+        self.episodes += other.episodes
+
+    def reset(self):
+        self.phase_ns = dict.fromkeys(PHASES, 0)
+        self.steps = 0
+        self.episodes = 0
+
+    def stop(self):
+        self.stop_ns = perf_counter_ns()
+
+    @property
+    def elapsed_seconds(self):
+        stop_ns = self.stop_ns if self.stop_ns is not None else perf_counter_ns()
+        return (stop_ns - self.start_ns) / 1e9
+
+    def summary(self):
+        elapsed = self.elapsed_seconds
+        phases_total = sum(self.phase_ns.values())
+        return dict(
+            elapsed_seconds=elapsed,
+            steps=self.steps,
+            episodes=self.episodes,
+            steps_per_second=self.steps / elapsed if elapsed > 0 else 0.0,
+            episodes_per_second=self.episodes / elapsed if elapsed > 0 else 0.0,
+            phases={
+                phase: dict(
+                    seconds=duration / 1e9,
+                    fraction=duration / phases_total if phases_total > 0 else 0.0,
+                )
+                for phase, duration in self.phase_ns.items()
+            },
+        )
+
+    def report(self):
+        summary = self.summary()
+        lines = [
+            f"Elapsed - {summary['elapsed_seconds']:.2f}s, "
+            f"Steps/sec - {summary['steps_per_second']:.1f}, "
+            f"Episodes/sec - {summary['episodes_per_second']:.2f}"
+        ]
+        for phase, phase_summary in summary["phases"].items():
+            lines.append(
+                f"  {phase:<10}{phase_summary['seconds']:>10.3f}s"
+                f"{phase_summary['fraction']:>8.1%}"
+            )
+        return "\n".join(lines)
+
+    def save(self, path):
+        with open(path, mode="w") as fd:
+            json.dump(self.summary(), fd, indent=2)
+
+
+def start_cprofile():
+    profile = cProfile.Profile()
+    profile.enable()
+    return profile
@@ -0,0 +1,176 @@
+import json
+from pathlib import Path
+
+import numpy as np
+
+from snake_learner.q_table import QTable
+from snake_learner.snake_action import SnakeAction
+
+JSON_FORMAT = "json"
+BINARY_FORMAT = "binary"
+Q_FILE_SUFFIXES = {JSON_FORMAT: ".json", BINARY_FORMAT: ".qbin"}
+
+# Binary Q files start with a fixed size JSON header, padded with spaces,
+# followed by the sorted state keys and the matching rows of action values.
+MAGIC = b"SNAKEQ01"
+HEADER_SIZE = 1024
+ALIGNMENT = 64
+
+
+def q_file_format(path):
+    with open(path, mode="rb") as fd:
+        if fd.read(len(MAGIC)) == MAGIC:
+            return BINARY_FORMAT
+    return JSON_FORMAT
+
+
+def save_q(states, values, path, q_format=None):
+    if q_format is None:
+        q_format = BINARY_FORMAT if Path(path).suffix == ".qbin" else JSON_FORMAT
+    if q_format == BINARY_FORMAT:
+        save_q_binary(states=states, values=values, path=path)
+    else:
+        save_q_json(states=states, values=values, path=path)
+
+
+def save_q_json(states, values, path, chunk_size=10_000):
+    # Written in chunks of rows, so no dictionary of the whole table is built.
+    values = np.asarray(values)
+    with open(path, mode="w") as fd:
+        fd.write("{")
+        for start in range(0, len(states), chunk_size):
+            rows = values[start:start + chunk_size].tolist()
+            fd.write(
+                ("," if start != 0 else "")
+                + ",".join(
+                    f"\n {json.dumps(str(state))}: {json.dumps(row)}"
+                    for state, row in zip(states[start:start + chunk_size], rows)
+                )
+            )
+        fd.write("\n}")
+
+
+def save_q_binary(states, values, path):
+    if len(states) != 0 and all(isinstance(state, (int, np.integer)) for state in states):
+        key_type = "int"
+        keys = np.array(states, dtype="<i8")
+    else:
+        key_type = "str"
+        keys = np.array([str(state).encode("ascii") for state in states], dtype="S")
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    values = np.asarray(values, dtype="<f8").reshape(len(keys), len(SnakeAction))[order]
+    keys_offset = HEADER_SIZE
+    values_offset = align(keys_offset + keys.nbytes)
+    header = json.dumps(
+        dict(
+            states_number=len(keys),
+            actions_number=values.shape[1],
+            key_type=key_type,
+            keys_dtype=keys.dtype.str,
+            values_dtype=values.dtype.str,
+            keys_offset=keys_offset,
+            values_offset=values_offset,
+        )
+    ).encode("ascii")
+    if len(MAGIC) + len(header) > HEADER_SIZE:
+        raise ValueError("Q file header is too long")
+    with open(path, mode="wb") as fd:
+        fd.write(MAGIC + header.ljust(HEADER_SIZE - len(MAGIC)))
+        keys.tofile(fd)
+        fd.write(b"\0" * (values_offset - keys_offset - keys.nbytes))
+        values.tofile(fd)
+
+
+def align(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+class MappedQFile:
+
+    def __init__(self, path):
+        with open(path, mode="rb") as fd:
+            header = fd.read(HEADER_SIZE)
+        if not header.startswith(MAGIC):
+            raise ValueError(f"{path} is not a binary Q file")
+        header = json.loads(header[len(MAGIC):])
+        self.key_type = int if header["key_type"] == "int" else str
+        states_number = header["states_number"]
+        self.keys = map_array(
+            path,
+            dtype=header["keys_dtype"],
+            offset=header["keys_offset"],
+            shape=(states_number,),
+        )
+        self.values = map_array(
+            path,
+            dtype=header["values_dtype"],
+            offset=header["values_offset"],
+            shape=(states_number, header["actions_number"]),
+        )
+
+    def __len__(self):
+        return self.keys.shape[0]
+
+    def encode_key(self, state):
+        if self.key_type is int:
+            return int(state)
+        return str(state).encode("ascii")
+
+    def lookup(self, state):
+        key = self.encode_key(state)
+        index = np.searchsorted(self.keys, key)
+        if index == len(self) or self.keys[index] != key:
+            return None
+        return np.array(self.values[index])
+
+    @property
+    def states(self):
+        if self.key_type is int:
+            return self.keys.tolist()
+        return [key.decode("ascii") for key in self.keys.tolist()]
+
+    def items(self):
+        return zip(self.states, self.values)
+
+
+def map_array(path, dtype, offset, shape):
+    if shape[0] == 0:
+        # Empty memory maps are not supported.
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(path, mode="r", dtype=np.dtype(dtype), offset=offset, shape=shape)
+
+
+class LazyQTable(QTable):
+
+    # Rows are read from a memory mapped Q file the first time a state is
+    # used, so only visited states are ever loaded.
+
+    def __init__(self, q_file: MappedQFile, **kwargs):
+        super().__init__(**kwargs)
+        self.q_file = q_file
+
+    def add_state(self, state):
+        state_id = super().add_state(state)
+        row = self.q_file.lookup(state)
+        if row is not None:
+            self._values[state_id] = row
+        return state_id
+
+
+def load_q_items(path):
+    if q_file_format(path) == BINARY_FORMAT:
+        return MappedQFile(path).items()
+    with open(path, mode="r") as fd:
+        return json.load(fd).items()
+
+
+def convert_q_file(input_path, output_path, q_format=None):
+    states, values = [], []
+    for state, value in load_q_items(input_path):
+        if isinstance(state, str) and state.isdigit():
+            state = int(state)
+        states.append(state)
+        values.append(value)
+    values = np.array(values, dtype=float).reshape(len(states), len(SnakeAction))
+    save_q(states=states, values=values, path=output_path, q_format=q_format)
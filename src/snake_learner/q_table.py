@@ -0,0 +1,461 @@
+import weakref
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from snake_learner.snake_action import SnakeAction
+
+
+class QTable:
+
+    def __init__(self, initial_capacity=1_024, dtype=np.float64):
+        # Every state is interned to a row in one contiguous values matrix.
+        self.index = {}
+        self.states = []
+        self._values = np.zeros((initial_capacity, len(SnakeAction)), dtype=dtype)
+        # Rows looked up since the changes were last taken, and states removed
+        # since then, once tracking is on. Values are updated through looked
+        # up rows, and writers by id mark the rows they change.
+        self.changed_ids = None
+        self.removed_states = None
+
+    @property
+    def values(self):
+        return self._values[:len(self.states)]
+
+    @property
+    def all_values(self):
+        return self._values
+
+    @property
+    def capacity(self):
+        return self._values.shape[0]
+
+    def __len__(self):
+        return len(self.states)
+
+    def __contains__(self, state):
+        return state in self.index
+
+    def __getitem__(self, state):
+        # The id is resolved first since adding a state may reallocate values.
+        state_id = self.state_id(state)
+        return self._values[state_id]
+
+    def __setitem__(self, state, value):
+        state_id = self.state_id(state)
+        self._values[state_id] = value
+
+    def __iter__(self):
+        return iter(self.states)
+
+    def keys(self):
+        return iter(self.states)
+
+    def items(self):
+        return zip(self.states, self.values)
+
+    def update(self, other):
+        for state, value in other.items():
+            self[state] = value
+
+    def update_rows(self, states, values):
+        # Bulk version of update: new states are interned together and all
+        # rows are written with one assignment.
+        new_states = [state for state in states if state not in self.index]
+        states_number = len(self.states) + len(new_states)
+        if states_number > self.capacity:
+            self.resize(max(2 * self.capacity, states_number))
+        self.index.update(zip(new_states, range(len(self.states), states_number)))
+        self.states.extend(new_states)
+        if len(new_states) == len(states):
+            first_id = states_number - len(states)
+            self._values[first_id:states_number] = values
+            state_ids = range(first_id, states_number)
+        else:
+            state_ids = [self.index[state] for state in states]
+            self._values[state_ids] = values
+        self.mark_changed(state_ids)
+
+    def state_id(self, state):
+        state_id = self.index.get(state)
+        if state_id is None:
+            state_id = self.add_state(state)
+        if self.changed_ids is not None:
+            self.changed_ids.add(state_id)
+        return state_id
+
+    def add_state(self, state):
+        state_id = len(self.states)
+        if state_id == self.capacity:
+            self.resize(max(2 * self.capacity, 1))
+        self.index[state] = state_id
+        self.states.append(state)
+        return state_id
+
+    def resize(self, capacity):
+        values = np.zeros((capacity, self._values.shape[1]), dtype=self._values.dtype)
+        values[:len(self.states)] = self.values
+        self._values = values
+
+    def live_ids(self):
+        return np.arange(len(self.states))
+
+    def track_changes(self):
+        self.changed_ids = set()
+        self.removed_states = []
+
+    def mark_changed(self, state_ids):
+        if self.changed_ids is not None:
+            self.changed_ids.update(state_ids)
+
+    def take_changes(self):
+        changed_ids = np.array(sorted(self.changed_ids), dtype=int)
+        removed_states = self.removed_states
+        self.track_changes()
+        return changed_ids, removed_states
+
+    def snapshot(self):
+        return self.values.copy()
+
+    def changes_since(self, snapshot):
+        old_states_number = snapshot.shape[0]
+        changed_ids = np.concatenate(
+            [
+                np.flatnonzero(
+                    np.any(self.values[:old_states_number] != snapshot, axis=1)
+                ),
+                np.arange(old_states_number, len(self)),
+            ]
+        )
+        deltas = self.values[changed_ids].copy()
+        old_ids = changed_ids < old_states_number
+        deltas[old_ids] -= snapshot[changed_ids[old_ids]]
+        return changed_ids, deltas
+
+    def strengths(self):
+        return np.linalg.norm(self.values, axis=1)
+
+    def keep_states(self, mask):
+        kept_ids = np.flatnonzero(mask)
+        if self.changed_ids is not None:
+            self.removed_states.extend(
+                self.states[state_id] for state_id in np.flatnonzero(~mask)
+            )
+            # Kept rows move to the front, in order.
+            new_ids = np.cumsum(mask) - 1
+            self.changed_ids = {
+                int(new_ids[state_id]) for state_id in self.changed_ids
+                if mask[state_id]
+            }
+        self.states = [self.states[state_id] for state_id in kept_ids]
+        self.index = {state: state_id for state_id, state in enumerate(self.states)}
+        self._values[:len(kept_ids)] = self._values[kept_ids]
+        self._values[len(kept_ids):] = 0
+
+    def clear_by_strength(self, min_strength=None, percentile=None, top_k=None):
+        self.keep_states(
+            strength_mask(
+                self.strengths(),
+                min_strength=min_strength,
+                percentile=percentile,
+                top_k=top_k,
+            )
+        )
+
+    def export(self, mask=None):
+        if mask is None:
+            return self.states, self.values
+        kept_ids = np.flatnonzero(mask)
+        return [self.states[state_id] for state_id in kept_ids], self.values[kept_ids]
+
+    def to_dict(self):
+        return dict(zip(self.states, self.values.tolist()))
+
+
+class BoundedQTable(QTable):
+
+    # Holds at most max_states states. When it is full, a batch of cold
+    # states is evicted: out of the least recently visited ones, those
+    # visited the fewest times, and the weakest among equally visited ones.
+    # Rows of evicted states are reused, so ids of kept states never change.
+    # Free rows hold None in states and zeros in values.
+
+    def __init__(
+        self, max_states, evict_fraction=0.1, candidates_factor=2, dtype=np.float64
+    ):
+        super().__init__(initial_capacity=max_states, dtype=dtype)
+        self.max_states = max_states
+        self.evict_number = max(1, int(max_states * evict_fraction))
+        self.candidates_factor = candidates_factor
+        self.visits = np.zeros(max_states, dtype=np.int64)
+        # Visit clock of the last lookup of every row.
+        self.last_visit = np.zeros(max_states, dtype=np.int64)
+        self.live = np.zeros(max_states, dtype=bool)
+        self.clock = 0
+        self.free_ids = []
+        self.eviction_callbacks = []
+
+    def __len__(self):
+        return len(self.index)
+
+    def __iter__(self):
+        return iter(self.export()[0])
+
+    def keys(self):
+        return iter(self.export()[0])
+
+    def items(self):
+        return zip(*self.export())
+
+    def update_rows(self, states, values):
+        # New states may evict others, so rows are added one at a time.
+        for state, value in zip(states, values):
+            self[state] = value
+
+    def state_id(self, state):
+        state_id = self.index.get(state)
+        if state_id is None:
+            state_id = self.add_state(state)
+        self.clock += 1
+        self.visits[state_id] += 1
+        self.last_visit[state_id] = self.clock
+        if self.changed_ids is not None:
+            self.changed_ids.add(state_id)
+        return state_id
+
+    def add_state(self, state):
+        if len(self.index) == self.max_states:
+            self.evict()
+        if len(self.free_ids) != 0:
+            state_id = self.free_ids.pop()
+            self.states[state_id] = state
+        else:
+            state_id = len(self.states)
+            self.states.append(state)
+        self.index[state] = state_id
+        self.live[state_id] = True
+        self.visits[state_id] = 0
+        self.last_visit[state_id] = self.clock
+        return state_id
+
+    def resize(self, capacity):
+        raise ValueError("A bounded Q table cannot be resized")
+
+    def live_ids(self):
+        return np.flatnonzero(self.live[:len(self.states)])
+
+    def evict(self):
+        live_ids = self.live_ids()
+        candidates_number = min(
+            len(live_ids), self.candidates_factor * self.evict_number
+        )
+        candidates = live_ids[
+            np.argpartition(self.last_visit[live_ids], candidates_number - 1)[
+                :candidates_number
+            ]
+        ]
+        order = np.lexsort(
+            (
+                np.linalg.norm(self._values[candidates], axis=1),
+                self.visits[candidates],
+            )
+        )
+        self.evict_ids(candidates[order[:self.evict_number]])
+
+    def evict_ids(self, state_ids):
+        if self.changed_ids is not None:
+            self.changed_ids.difference_update(state_ids.tolist())
+            self.removed_states.extend(
+                self.states[state_id] for state_id in state_ids.tolist()
+            )
+        for state_id in state_ids.tolist():
+            del self.index[self.states[state_id]]
+            self.states[state_id] = None
+        self._values[state_ids] = 0
+        self.live[state_ids] = False
+        self.visits[state_ids] = 0
+        self.free_ids.extend(state_ids.tolist())
+        for callback in self.eviction_callbacks:
+            callback(state_ids)
+
+    def strengths(self):
+        return np.linalg.norm(self._values[self.live_ids()], axis=1)
+
+    def keep_states(self, mask):
+        self.evict_ids(self.live_ids()[~mask])
+
+    def export(self, mask=None):
+        live_ids = self.live_ids()
+        if mask is not None:
+            live_ids = live_ids[mask]
+        return [self.states[state_id] for state_id in live_ids], self.values[live_ids]
+
+    def to_dict(self):
+        states, values = self.export()
+        return dict(zip(states, values.tolist()))
+
+
+class SharedQTable:
+
+    # States are integers in [0, states_number), as produced by views with a
+    # bounded integer encoding, so the state itself is its row. Several
+    # processes may update the table at the same time without locks, in the
+    # Hogwild manner: concurrent updates of the same value may be lost.
+    # Inserting a state only marks its row as visited. Rows start as zeros in
+    # a fresh shared memory block, so concurrent insertions of the same state
+    # are idempotent and need no index synchronization.
+
+    def __init__(self, states_number, name=None, dtype=np.float64):
+        self.states_number = states_number
+        self.dtype = np.dtype(dtype)
+        self.owner = name is None
+        values_size = states_number * len(SnakeAction) * self.dtype.itemsize
+        if self.owner:
+            self.memory = shared_memory.SharedMemory(
+                create=True, size=values_size + states_number
+            )
+        else:
+            self.memory = attach_shared_memory(name)
+        self.all_values = np.ndarray(
+            (states_number, len(SnakeAction)), dtype=self.dtype,
+            buffer=self.memory.buf,
+        )
+        self.visited = np.ndarray(
+            (states_number,), dtype=np.uint8, buffer=self.memory.buf,
+            offset=values_size,
+        )
+        self._finalizer = weakref.finalize(
+            self, release_shared_memory, self.memory, self.owner
+        )
+
+    def __getstate__(self):
+        return dict(
+            states_number=self.states_number,
+            name=self.memory.name,
+            dtype=self.dtype.str,
+        )
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    @property
+    def name(self):
+        return self.memory.name
+
+    @property
+    def states(self):
+        return np.flatnonzero(self.visited).tolist()
+
+    @property
+    def values(self):
+        return self.all_values[self.visited != 0]
+
+    def __len__(self):
+        return int(np.count_nonzero(self.visited))
+
+    def __contains__(self, state):
+        return bool(self.visited[state])
+
+    def __getitem__(self, state):
+        return self.all_values[self.state_id(state)]
+
+    def __setitem__(self, state, value):
+        self.all_values[self.state_id(state)] = value
+
+    def __iter__(self):
+        return iter(self.states)
+
+    def keys(self):
+        return iter(self.states)
+
+    def items(self):
+        return zip(self.states, self.values)
+
+    def update(self, other):
+        for state, value in other.items():
+            self[state] = value
+
+    def update_rows(self, states, values):
+        state_ids = np.array(states, dtype=int)
+        self.all_values[state_ids] = values
+        self.visited[state_ids] = 1
+
+    def state_id(self, state):
+        state = int(state)
+        self.visited[state] = 1
+        return state
+
+    def snapshot(self):
+        return None
+
+    def mark_changed(self, state_ids):
+        pass
+
+    def changes_since(self, snapshot):
+        # Updates are written to the shared table directly, so there is
+        # nothing to merge.
+        return np.zeros(0, dtype=int), np.zeros((0, len(SnakeAction)))
+
+    def strengths(self):
+        return np.linalg.norm(self.values, axis=1)
+
+    def clear_by_strength(self, min_strength=None, percentile=None, top_k=None):
+        mask = strength_mask(
+            self.strengths(),
+            min_strength=min_strength,
+            percentile=percentile,
+            top_k=top_k,
+        )
+        weak_states = np.flatnonzero(self.visited)[~mask]
+        self.all_values[weak_states] = 0
+        self.visited[weak_states] = 0
+
+    def export(self, mask=None):
+        states = np.flatnonzero(self.visited)
+        if mask is not None:
+            states = states[mask]
+        return states.tolist(), self.all_values[states]
+
+    def to_dict(self):
+        return dict(zip(self.states, self.values.tolist()))
+
+    def close(self):
+        self._finalizer()
+
+
+def strength_mask(strengths, min_strength=None, percentile=None, top_k=None):
+    # Marks the states that pass every given threshold: strength above
+    # min_strength, at least the given percentile of strengths, and among the
+    # top_k strongest states.
+    mask = np.ones(len(strengths), dtype=bool)
+    if len(strengths) == 0:
+        return mask
+    if min_strength is not None:
+        mask &= strengths > min_strength
+    if percentile is not None:
+        mask &= strengths >= np.percentile(strengths, percentile)
+    if top_k is not None and top_k < len(strengths):
+        top_mask = np.zeros(len(strengths), dtype=bool)
+        top_mask[np.argpartition(-strengths, top_k)[:top_k]] = True
+        mask &= top_mask
+    return mask
+
+
+def attach_shared_memory(name):
+    memory = shared_memory.SharedMemory(name=name)
+    # Attaching processes must not let the resource tracker unlink the block
+    # when they exit, only the owner does.
+    resource_tracker.unregister(memory._name, "shared_memory")
+    return memory
+
+
+def release_shared_memory(memory, owner):
+    if owner:
+        memory.unlink()
+    try:
+        memory.close()
+    except BufferError:
+        # Arrays viewing the block are still alive, the mapping is released
+        # with them.
+        pass
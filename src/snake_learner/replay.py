@@ -0,0 +1,99 @@
+import numpy as np
+
+TERMINAL_STATE = -1
+
+
+class ReplayBuffer:
+
+    # Fixed size ring buffer of transitions between Q table state ids.
+    # Terminal transitions use TERMINAL_STATE as their next state.
+
+    def __init__(
+        self, capacity, prioritized=False, priority_exponent=0.6, random=None
+    ):
+        self.random = random if random is not None else np.random.default_rng()
+        self.capacity = capacity
+        self.prioritized = prioritized
+        self.priority_exponent = priority_exponent
+        self.states = np.zeros(capacity, dtype=np.int64)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float64)
+        self.next_states = np.zeros(capacity, dtype=np.int64)
+        self.priorities = np.zeros(capacity, dtype=np.float64)
+        # Priorities only grow in the running maximum, as in the prioritized
+        # replay paper, so adding a transition needs no scan.
+        self.max_priority = 1.0
+        self.size = 0
+        self.position = 0
+
+    def __len__(self):
+        return self.size
+
+    def add(self, state_id, action_index, reward, next_state_id):
+        index = self.position
+        self.states[index] = state_id
+        self.actions[index] = action_index
+        self.rewards[index] = reward
+        self.next_states[index] = next_state_id
+        if self.prioritized:
+            # New transitions are replayed at least once with high probability.
+            self.priorities[index] = self.max_priority
+        self.position = (self.position + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def discard_states(self, state_ids):
+        # Drops transitions from or to the given states, keeping the rest in
+        # insertion order at the front of the buffer.
+        start = self.position if self.size == self.capacity else 0
+        order = (start + np.arange(self.size)) % self.capacity
+        kept = order[
+            ~(
+                np.isin(self.states[order], state_ids)
+                | np.isin(self.next_states[order], state_ids)
+            )
+        ]
+        for column in [
+            self.states, self.actions, self.rewards, self.next_states,
+            self.priorities,
+        ]:
+            column[:len(kept)] = column[kept]
+        self.size = len(kept)
+        self.position = self.size % self.capacity
+
+    def sample(self, batch_size):
+        if not self.prioritized:
+            return self.random.integers(self.size, size=batch_size)
+        probabilities = self.priorities[:self.size] ** self.priority_exponent
+        probabilities /= probabilities.sum()
+        return self.random.choice(self.size, size=batch_size, p=probabilities)
+
+    def update_priorities(self, indices, td_deltas):
+        priorities = np.abs(td_deltas) + 1e-6
+        self.priorities[indices] = priorities
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+
+    def update_q(self, values, batch_size, alpha, discount_factor):
+        indices = self.sample(batch_size)
+        states, actions = self.states[indices], self.actions[indices]
+        next_states = self.next_states[indices]
+        terminal = next_states == TERMINAL_STATE
+        best_rewards = np.where(terminal, 0, values[next_states].max(axis=1))
+        td_deltas = (
+            self.rewards[indices]
+            + discount_factor * best_rewards
+            - values[states, actions]
+        )
+        # A transition sampled more than once, or transitions sharing a state
+        # and action, move the value by the mean of their TD deltas rather
+        # than by one step each.
+        actions_number = values.shape[1]
+        pairs, inverse, counts = np.unique(
+            states * actions_number + actions, return_inverse=True,
+            return_counts=True,
+        )
+        delta_means = np.bincount(inverse, weights=td_deltas) / counts
+        updated_states = pairs // actions_number
+        values[updated_states, pairs % actions_number] += alpha * delta_means
+        if self.prioritized:
+            self.update_priorities(indices, td_deltas)
+        return updated_states
@@ -0,0 +1,101 @@
+import multiprocessing
+import signal
+
+import matplotlib
+
+from snake_learner.plot_util import plot_field_history, plot_float_field_histogram, \
+    plot_int_field_histogram, plot_max_field_history, plot_recent_mean_field_history, \
+    plot_values_histogram
+
+INT_FIELDS = ["score", "duration"]
+REPORT_FIELDS = ["rewards", "score", "duration", "velocity"]
+
+# History and output directory of a report worker, set once when the pool
+# starts.
+report_history = None
+report_output_dir = None
+
+
+def report_plots(plot_window):
+    plots = []
+    for field in REPORT_FIELDS:
+        plots.append((plot_field_history, dict(field=field)))
+        plots.append(
+            (plot_recent_mean_field_history, dict(field=field, n=plot_window))
+        )
+        plots.append((plot_max_field_history, dict(field=field)))
+        if field in INT_FIELDS:
+            plots.append((plot_int_field_histogram, dict(field=field)))
+        else:
+            plots.append((plot_float_field_histogram, dict(field=field, bins=50)))
+    plots.append((plot_field_history, dict(field="states")))
+    return plots
+
+
+class PlotReport:
+
+    # Renders the training plots in a process pool, so the caller can keep
+    # working until the report is waited for.
+
+    def __init__(
+        self, history, state_strengths, output_dir, plot_window, workers_number=None
+    ):
+        self.history = history
+        self.state_strengths = state_strengths
+        self.output_dir = output_dir
+        self.plot_window = plot_window
+        self.workers_number = workers_number
+        self.pool = None
+        self.results = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.wait()
+        else:
+            self.pool.terminate()
+            self.pool.join()
+
+    def start(self):
+        self.pool = multiprocessing.Pool(
+            self.workers_number,
+            initializer=init_report_worker,
+            initargs=(self.history, self.output_dir),
+        )
+        self.results = [
+            self.pool.apply_async(run_plot, (plot, kwargs))
+            for plot, kwargs in report_plots(self.plot_window)
+        ]
+        self.results.append(
+            self.pool.apply_async(
+                plot_values_histogram,
+                kwds=dict(
+                    values=self.state_strengths,
+                    title="Strength histogram",
+                    xlabel="Strength",
+                    bins=50,
+                    output_path=self.output_dir / "q_strength_histogram.png",
+                ),
+            )
+        )
+        self.pool.close()
+
+    def wait(self):
+        for result in self.results:
+            result.get()
+        self.pool.join()
+
+
+def init_report_worker(history, output_dir):
+    global report_history, report_output_dir
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    matplotlib.use("Agg")
+    report_history = history
+    report_output_dir = output_dir
+
+
+def run_plot(plot, kwargs):
+    plot(history=report_history, output_dir=report_output_dir, **kwargs)
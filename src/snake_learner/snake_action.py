@@ -1,13 +1,23 @@
 from enum import Enum
 
+import numpy as np
+
 from snake_learner.direction import Direction
 
 
-ACTION_TO_INDEX_DELTA = {
-    "TURN_LEFT": -1,
-    "TURN_RIGHT": 1,
-    "FORWARD": 0,
-}
+ACTION_TO_INDEX_DELTA = [-1, 0, 1]
+# TURN_TABLE[direction value, action value] is the value of the new direction.
+TURN_TABLE = np.array(
+    [
+        [
+            (direction_index + index_delta) % len(Direction)
+            for index_delta in ACTION_TO_INDEX_DELTA
+        ]
+        for direction_index in range(len(Direction))
+    ]
+)
+TURN_TABLE.setflags(write=False)
+DIRECTIONS = tuple(Direction)
 
 
 class SnakeAction(Enum):
@@ -17,7 +27,4 @@ class SnakeAction(Enum):
     TURN_RIGHT = 2
 
     def turn(self, direction: Direction):
-        direction_index = (
-            direction.value + ACTION_TO_INDEX_DELTA[self.name]
-        ) % len(Direction)
-        return Direction(direction_index)
+        return DIRECTIONS[TURN_TABLE[direction.value, self.value]]
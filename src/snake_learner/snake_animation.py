@@ -1,61 +1,239 @@
+import shutil
+import subprocess
+from pathlib import Path
 from typing import List
 
+import matplotlib
+import numpy as np
 from matplotlib import pyplot as plt
 from matplotlib.animation import FuncAnimation
+from PIL import Image
 
-from snake_learner.history import HistoryPoint
+from snake_learner.history import GameHistory, HistoryPoint
 
 FOOD_BASE_SIZE = 7
 CREATURE_BASE_SIZE = 10
+INTERVAL = 200
+
+# Raster frames hold indices into PALETTE, so GIF frames need no
+# quantization and video frames are a single lookup away from RGB.
+BACKGROUND, WALL, BODY, HEAD, FOOD = range(5)
+PALETTE = np.array(
+    [
+        (255, 255, 255),
+        (0, 0, 0),
+        (0, 128, 0),
+        (0, 0, 255),
+        (255, 165, 0),
+    ],
+    dtype=np.uint8,
+)
 
 
 class SnakeAnimation:
 
-    def __init__(self, history: List[HistoryPoint]):
+    def __init__(
+        self,
+        history: List[HistoryPoint],
+        interval=INTERVAL,
+        max_frames=None,
+        duration=None,
+    ):
         self.history = history
-        self.fig, self.ax = plt.subplots()
-        self.anim = FuncAnimation(
-            self.fig, self.update, frames=len(self.history), interval=200
+        self.interval = interval
+        if duration is not None:
+            duration_frames = max(2, int(duration * 1000 / interval))
+            max_frames = (
+                duration_frames if max_frames is None
+                else min(max_frames, duration_frames)
+            )
+        self.frame_indices = select_frames(
+            length=len(history),
+            eat_indices=eat_indices(history),
+            max_frames=max_frames,
         )
+        self.fig, self.ax = None, None
+        self.anim = None
 
-    def save(self, output):
+    def save(self, output, raster=False):
+        if raster:
+            self.save_raster(output)
+            return
+        self.build_animation(blit=False)
         self.anim.save(str(output))
+        plt.close(self.fig)
+
+    def save_raster(self, output, cell_size=16):
+        write_frames(
+            frames=(
+                raster_frame(history_point, cell_size=cell_size)
+                for history_point in self.frame_points()
+            ),
+            output=output,
+            interval=self.interval,
+        )
+
+    def frame_points(self):
+        # History points are produced one at a time in move order, which a
+        # GameHistory replays without rebuilding earlier moves.
+        for index in self.frame_indices:
+            yield self.history[index]
 
     def play(self):
+        self.build_animation(blit=True)
         plt.show()
 
-    def update(self, i):
-        if i >= len(self.history):
-            return
-        history_point = self.history[i]
+    def build_animation(self, blit):
+        self.fig, self.ax = plt.subplots()
+        self.anim = FuncAnimation(
+            self.fig,
+            self.update,
+            frames=self.frame_indices.tolist(),
+            init_func=self.init_artists,
+            interval=self.interval,
+            blit=blit,
+        )
 
+    def init_artists(self):
+        # Artists are created once and only their data changes between
+        # frames. The status line sits inside the axes so blitting redraws it.
+        rows, columns = self.history[0].shape
         self.ax.cla()
-
-        rows, columns = history_point.shape
+        # Ticks are most of the cost of drawing a frame, and the border
+        # already shows the board.
+        self.ax.set_axis_off()
         self.ax.set_xlim(-1, columns)
-        self.ax.set_ylim(-1, rows)
+        self.ax.set_ylim(-1, rows + 1)
         self.ax.hlines(rows, -1, columns, color="black")
         self.ax.hlines(-1, -1, columns, color="black")
-        self.ax.vlines(rows, -1, rows, color="black")
+        self.ax.vlines(columns, -1, rows, color="black")
         self.ax.vlines(-1, -1, rows, color="black")
-        self.ax.set_title(
+        empty_offsets = np.zeros((0, 2))
+        self.body_scatter = self.ax.scatter(
+            empty_offsets[:, 0], empty_offsets[:, 1], c="green"
+        )
+        self.head_scatter = self.ax.scatter(
+            empty_offsets[:, 0], empty_offsets[:, 1], c="blue"
+        )
+        self.food_scatter = self.ax.scatter(
+            empty_offsets[:, 0], empty_offsets[:, 1], c="orange"
+        )
+        self.status_text = self.ax.text(
+            (columns - 1) / 2, rows + 0.5, "", ha="center", va="center"
+        )
+        return self.artists
+
+    @property
+    def artists(self):
+        return (
+            self.body_scatter, self.head_scatter, self.food_scatter,
+            self.status_text,
+        )
+
+    def update(self, i):
+        if i >= len(self.history):
+            return self.artists
+        history_point = self.history[i]
+        # Offsets are (x, y), which is (column, row).
+        snake = np.array(history_point.snake).reshape(-1, 2)[:, ::-1]
+        self.body_scatter.set_offsets(snake[:-1])
+        self.head_scatter.set_offsets(snake[-1:])
+        if history_point.food is None:
+            self.food_scatter.set_offsets(np.zeros((0, 2)))
+        else:
+            self.food_scatter.set_offsets([history_point.food[::-1]])
+        self.status_text.set_text(
             f"Move {history_point.moves}/{len(self.history)}, "
             f"Score {history_point.score}"
         )
+        return self.artists
 
-        self.snake_scatter(history_point)
-        self.food_scatter(history_point)
 
-    def food_scatter(self, history_point):
-        self.ax.scatter(
-            [history_point.food[1]], [history_point.food[0]], c="orange"
-        )
+def eat_indices(history):
+    if isinstance(history, GameHistory):
+        return history.eat_indices()
+    scores = np.array([history_point.score for history_point in history])
+    return np.flatnonzero(np.diff(scores, prepend=scores[:1]) > 0)
 
-    def snake_scatter(self, history_point: HistoryPoint):
-        snake_cells_without_head = list(history_point.snake)[:-1]
-        snake_cell_x = [cell[1] for cell in snake_cells_without_head]
-        snake_cell_y = [cell[0] for cell in snake_cells_without_head]
-        self.ax.scatter(snake_cell_x, snake_cell_y, c="green")
-        self.ax.scatter(
-            [history_point.head[1]], [history_point.head[0]], c="blue"
-        )
+
+def select_frames(length, eat_indices, max_frames=None):
+    # Eat events, the first frame and the final frame are always kept when
+    # they fit. The rest of the budget goes to evenly spaced moves.
+    if max_frames is None or length <= max_frames:
+        return np.arange(length)
+    key_frames = np.unique(np.concatenate([[0], eat_indices, [length - 1]]))
+    if len(key_frames) >= max_frames:
+        kept = key_frames[
+            np.linspace(0, len(key_frames) - 2, max_frames - 1).round().astype(int)
+        ]
+        return np.unique(np.append(kept, length - 1))
+    other_frames = np.setdiff1d(np.arange(length), key_frames)
+    fill_frames = other_frames[
+        np.linspace(
+            0, len(other_frames) - 1, max_frames - len(key_frames)
+        ).round().astype(int)
+    ]
+    return np.unique(np.concatenate([key_frames, fill_frames]))
+
+
+def raster_frame(history_point: HistoryPoint, cell_size=16):
+    # One cell of wall surrounds the board, which also makes room for a head
+    # that left it. Rows are flipped so row 0 is at the bottom, as in plots.
+    rows, columns = history_point.shape
+    cells = np.full((rows + 2, columns + 2), WALL, dtype=np.uint8)
+    cells[1:-1, 1:-1] = BACKGROUND
+    if history_point.food is not None:
+        cells[history_point.food[0] + 1, history_point.food[1] + 1] = FOOD
+    snake = np.array(history_point.snake).reshape(-1, 2) + 1
+    cells[snake[:-1, 0], snake[:-1, 1]] = BODY
+    cells[snake[-1, 0], snake[-1, 1]] = HEAD
+    frame = cells[::-1]
+    return frame.repeat(cell_size, axis=0).repeat(cell_size, axis=1)
+
+
+def write_frames(frames, output, interval=INTERVAL):
+    output = Path(output)
+    if output.suffix == ".gif":
+        write_gif(frames, output, interval)
+    else:
+        write_video(frames, output, interval)
+
+
+def palette_image(frame):
+    image = Image.fromarray(frame, mode="P")
+    image.putpalette(PALETTE.ravel().tolist())
+    return image
+
+
+def write_gif(frames, output, interval):
+    images = (palette_image(frame) for frame in frames)
+    first_image = next(images)
+    first_image.save(
+        output, save_all=True, append_images=images, duration=interval, loop=0,
+        optimize=False,
+    )
+
+
+def write_video(frames, output, interval):
+    ffmpeg_path = shutil.which(matplotlib.rcParams["animation.ffmpeg_path"])
+    if ffmpeg_path is None:
+        raise RuntimeError(f"ffmpeg is required to write {output}")
+    frames = iter(frames)
+    first_frame = next(frames)
+    height, width = first_frame.shape
+    process = subprocess.Popen(
+        [
+            ffmpeg_path, "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "rgb24",
+            "-s", f"{width}x{height}", "-r", str(1000 / interval),
+            "-i", "-",
+            "-pix_fmt", "yuv420p", str(output),
+        ],
+        stdin=subprocess.PIPE,
+    )
+    process.stdin.write(PALETTE[first_frame].tobytes())
+    for frame in frames:
+        process.stdin.write(PALETTE[frame].tobytes())
+    process.stdin.close()
+    if process.wait() != 0:
+        raise RuntimeError(f"ffmpeg failed writing {output}")
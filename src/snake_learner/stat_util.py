@@ -2,14 +2,79 @@ import numpy as np
 
 
 def moving_max(values):
-    max_val = None
-    monotone_values = []
-    for val in values:
-        if max_val is None or val > max_val:
-            max_val = val
-        monotone_values.append(max_val)
-    return np.array(monotone_values)
+    return np.maximum.accumulate(np.asarray(values))
 
 
 def moving_mean(values, n):
-    return np.convolve(values, np.ones(n), mode='valid') / n
+    cumulative_sum = np.cumsum(np.concatenate([[0], values]))
+    return (cumulative_sum[n:] - cumulative_sum[:-n]) / n
+
+
+def decimate(values, max_points):
+    # Keeps the minimum and maximum of every bucket, so spikes survive the
+    # downsampling. Returns the kept indices and values.
+    values = np.asarray(values)
+    length = values.shape[0]
+    if length <= max_points:
+        return np.arange(length), values
+    bucket_size = int(np.ceil(2 * length / max_points))
+    buckets_number = int(np.ceil(length / bucket_size))
+    buckets = np.pad(
+        values, (0, buckets_number * bucket_size - length), mode="edge"
+    ).reshape(buckets_number, bucket_size)
+    indices = np.sort(
+        np.stack([buckets.argmin(axis=1), buckets.argmax(axis=1)], axis=1),
+        axis=1,
+    )
+    indices = indices + np.arange(buckets_number)[:, np.newaxis] * bucket_size
+    indices = np.unique(np.minimum(indices.ravel(), length - 1))
+    return indices, values[indices]
+
+
+class RollingStatistics:
+
+    # Mean over the last `window` values and max over all of them, both
+    # maintained in O(1) per added value.
+
+    def __init__(self, window):
+        self.window = window
+        self.values = [0.0] * window
+        self.count = 0
+        self.total = 0.0
+        self.max = None
+
+    def add(self, value):
+        index = self.count % self.window
+        if self.count >= self.window:
+            self.total -= self.values[index]
+        self.values[index] = value
+        self.total += value
+        self.count += 1
+        if self.max is None or value > self.max:
+            self.max = value
+
+    @property
+    def mean(self):
+        if self.count == 0:
+            return None
+        return self.total / min(self.count, self.window)
+
+
+class UniformBuffer:
+
+    # Uniform floats in [0, 1) drawn from the generator in large blocks, so
+    # single draws cost a list lookup.
+
+    def __init__(self, random, block_size=4_096):
+        self.random = random
+        self.block_size = block_size
+        self.block = []
+        self.index = 0
+
+    def next(self):
+        if self.index == len(self.block):
+            self.block = self.random.random(self.block_size).tolist()
+            self.index = 0
+        value = self.block[self.index]
+        self.index += 1
+        return value
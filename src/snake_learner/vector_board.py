@@ -0,0 +1,189 @@
+import numpy as np
+
+from snake_learner.direction import DIRECTION_DELTAS, Direction
+from snake_learner.snake_action import TURN_TABLE
+
+NO_FOOD = np.array([-1, -1])
+
+
+class VectorSnakeBoard:
+
+    def __init__(
+        self,
+        boards_number,
+        rows,
+        columns,
+        initial_size=3,
+        max_moves_to_score=None,
+        auto_reset=True,
+        random=None,
+    ):
+        self.random = random if random is not None else np.random.default_rng()
+        self.boards_number = boards_number
+        self.shape = np.array([rows, columns])
+        self.initial_size = initial_size
+        self.max_moves_to_score = max_moves_to_score
+        self.auto_reset = auto_reset
+        # Every snake is kept in a ring buffer of its cells, from tail to head,
+        # next to an occupancy grid used for collision checks.
+        self.capacity = rows * columns + 1
+        self.body = np.zeros((boards_number, self.capacity, 2), dtype=int)
+        self.tail_index = np.zeros(boards_number, dtype=int)
+        self.length = np.zeros(boards_number, dtype=int)
+        self.grid = np.zeros((boards_number, rows, columns), dtype=np.uint8)
+        self.direction = np.zeros(boards_number, dtype=int)
+        self.food = np.zeros((boards_number, 2), dtype=int)
+        self.moves = np.zeros(boards_number, dtype=int)
+        self.final_score = np.zeros(boards_number, dtype=int)
+        self.final_moves = np.zeros(boards_number, dtype=int)
+        self.episodes = np.zeros(boards_number, dtype=int)
+        self.restart()
+
+    @property
+    def indices(self):
+        return np.arange(self.boards_number)
+
+    @property
+    def head(self):
+        head_index = (self.tail_index + self.length - 1) % self.capacity
+        return self.body[self.indices, head_index]
+
+    @property
+    def score(self):
+        return self.length
+
+    @property
+    def done(self):
+        done = self.won | self.lost
+        if self.max_moves_to_score is not None:
+            done |= self.moves >= self.max_moves_to_score * self.score
+        return done
+
+    @property
+    def won(self):
+        return np.all(self.food == NO_FOOD, axis=1)
+
+    @property
+    def lost(self):
+        head = self.head
+        inside = self.in_bounds(head)
+        # Out of bounds heads are never counted in the grid, so any head
+        # counted more than once ran into the snake's body.
+        head_count = self.grid[
+            self.indices,
+            np.clip(head[:, 0], 0, self.shape[0] - 1),
+            np.clip(head[:, 1], 0, self.shape[1] - 1),
+        ]
+        return ~inside | (head_count > 1)
+
+    def in_bounds(self, locations):
+        return np.all((locations >= 0) & (locations < self.shape), axis=-1)
+
+    def restart(self, indices=None):
+        if indices is None:
+            indices = self.indices
+        indices = np.asarray(indices, dtype=int)
+        self.moves[indices] = 0
+        pending = indices
+        while len(pending) != 0:
+            pending = self.initialize_snakes(pending)
+        self.put_random_food(indices)
+
+    def turn(self, actions):
+        self.direction = TURN_TABLE[self.direction, np.asarray(actions, dtype=int)]
+        return self.move(self.direction)
+
+    def move(self, directions):
+        self.direction = np.asarray(directions, dtype=int)
+        self.moves += 1
+        indices = self.indices
+        new_head = self.head + DIRECTION_DELTAS[self.direction]
+        eats = np.all(new_head == self.food, axis=1)
+
+        moving = indices[~eats]
+        tail = self.body[moving, self.tail_index[moving]]
+        tail_inside = self.in_bounds(tail)
+        self.grid[
+            moving[tail_inside], tail[tail_inside, 0], tail[tail_inside, 1]
+        ] -= 1
+        self.tail_index[moving] = (self.tail_index[moving] + 1) % self.capacity
+        self.length[eats] += 1
+
+        head_index = (self.tail_index + self.length - 1) % self.capacity
+        self.body[indices, head_index] = new_head
+        inside = indices[self.in_bounds(new_head)]
+        self.grid[inside, new_head[inside, 0], new_head[inside, 1]] += 1
+        self.put_random_food(indices[eats])
+
+        done = self.done
+        if self.auto_reset and np.any(done):
+            finished = indices[done]
+            self.final_score[finished] = self.score[finished]
+            self.final_moves[finished] = self.moves[finished]
+            self.episodes[finished] += 1
+            self.restart(finished)
+        return done
+
+    def initialize_snakes(self, indices):
+        self.grid[indices] = 0
+        self.tail_index[indices] = 0
+        self.length[indices] = 1
+        first_cells = self.random_locations(len(indices))
+        self.body[indices, 0] = first_cells
+        self.grid[indices, first_cells[:, 0], first_cells[:, 1]] = 1
+        self.direction[indices] = self.random.integers(len(Direction), size=len(indices))
+        stuck_indices = []
+        for size in range(1, self.initial_size):
+            head = self.body[indices, size - 1]
+            directions = TURN_TABLE[self.direction[indices]]
+            candidates = head[:, np.newaxis, :] + DIRECTION_DELTAS[directions]
+            valid = self.in_bounds(candidates)
+            clipped = np.clip(candidates, 0, self.shape - 1)
+            valid &= self.grid[
+                indices[:, np.newaxis], clipped[..., 0], clipped[..., 1]
+            ] == 0
+            stuck = ~np.any(valid, axis=1)
+            stuck_indices.append(indices[stuck])
+            indices, directions = indices[~stuck], directions[~stuck]
+            candidates, valid = candidates[~stuck], valid[~stuck]
+            choice = np.argmax(
+                np.where(valid, self.random.random(valid.shape), -1), axis=1
+            )
+            chosen = np.arange(len(indices))
+            new_cells = candidates[chosen, choice]
+            self.direction[indices] = directions[chosen, choice]
+            self.body[indices, size] = new_cells
+            self.grid[indices, new_cells[:, 0], new_cells[:, 1]] += 1
+            self.length[indices] += 1
+        return np.concatenate([np.array([], dtype=int)] + stuck_indices)
+
+    def put_random_food(self, indices):
+        if len(indices) == 0:
+            return
+        free = self.grid[indices].reshape(len(indices), -1) == 0
+        cell_index = np.argmax(
+            np.where(free, self.random.random(free.shape), -1), axis=1
+        )
+        food = np.stack(np.unravel_index(cell_index, tuple(self.shape)), axis=1)
+        food[~np.any(free, axis=1)] = NO_FOOD
+        self.food[indices] = food
+
+    def random_locations(self, size):
+        return np.stack(
+            [
+                self.random.integers(self.shape[0], size=size),
+                self.random.integers(self.shape[1], size=size),
+            ],
+            axis=1,
+        )
+
+    def set_board(self, index, snake, direction: Direction, food):
+        snake = np.array(snake, dtype=int)
+        self.grid[index] = 0
+        self.tail_index[index] = 0
+        self.length[index] = len(snake)
+        self.body[index, :len(snake)] = snake
+        np.add.at(self.grid[index], (snake[:, 0], snake[:, 1]), 1)
+        self.direction[index] = direction.value
+        self.food[index] = food
+        self.moves[index] = 0
@@ -1,16 +1,40 @@
 import numpy as np
 
 from snake_learner.board import SnakeBoard
-from snake_learner.direction import Direction
-from snake_learner.linalg_util import closest_direction, project_to_direction
-from snake_learner.snake_action import SnakeAction
+from snake_learner.direction import DIRECTION_DELTAS, Direction
+from snake_learner.linalg_util import project_to_direction
+from snake_learner.snake_action import SnakeAction, TURN_TABLE
+
+_FORWARD = DIRECTION_DELTAS
+_RIGHT = DIRECTION_DELTAS[TURN_TABLE[:, SnakeAction.TURN_RIGHT.value]]
+_LEFT = DIRECTION_DELTAS[TURN_TABLE[:, SnakeAction.TURN_LEFT.value]]
+# CROSS_DIRECTIONS[direction value] holds the seven sight directions, going
+# clockwise from forward and skipping backward.
+CROSS_DIRECTIONS = np.stack(
+    [
+        _FORWARD,
+        _FORWARD + _RIGHT,
+        _RIGHT,
+        -_FORWARD + _RIGHT,
+        -_FORWARD + _LEFT,
+        _LEFT,
+        _FORWARD + _LEFT,
+    ],
+    axis=1,
+)
+CROSS_DIRECTIONS.setflags(write=False)
 
 
 class ViewGetter:
 
+    key_type = str
+
     def get_view(self, board: SnakeBoard):
         raise NotImplementedError("ViewGetter.get_view() is not implemented")
 
+    def parse_key(self, key: str):
+        return key
+
 
 class GridViewGetter(ViewGetter):
 
@@ -22,26 +46,60 @@ class GridViewGetter(ViewGetter):
         self.sight_distance = sight_distance
 
     def get_view(self, board: SnakeBoard):
-        sight = []
-        for i in np.arange(-self.sight_distance, self.sight_distance + 1):
-            for j in np.arange(-self.sight_distance, self.sight_distance + 1):
-                loc = board.head + np.array([i, j])
-                sight.append(self.get_cell_type(board, loc))
-        return "".join(sight)
-
-    @classmethod
-    def get_cell_type(cls, board, location):
-        if np.all(np.equal(location, board.food)):
-            return cls.FOOD
-        if board.is_valid_location(location):
-            return cls.EMPTY
-        return cls.BLOCK
+        # Cells of the window are filled with walls and the part of the
+        # window that lies on the board is copied from its occupancy grid.
+        window_size = 2 * self.sight_distance + 1
+        window = np.full(
+            (window_size, window_size), ord(self.BLOCK), dtype=np.uint8
+        )
+        corner = board.head - self.sight_distance
+        start = np.clip(corner, 0, board.shape)
+        end = np.clip(corner + window_size, 0, board.shape)
+        if np.all(start < end):
+            window[
+                start[0] - corner[0]:end[0] - corner[0],
+                start[1] - corner[1]:end[1] - corner[1],
+            ] = np.where(
+                board.grid[start[0]:end[0], start[1]:end[1]] == 0,
+                ord(self.EMPTY),
+                ord(self.BLOCK),
+            )
+        if board.food is not None:
+            food = board.food - corner
+            if np.all((food >= 0) & (food < window_size)):
+                window[food[0], food[1]] = ord(self.FOOD)
+        return window.tobytes().decode("ascii")
 
 
 class DistancesViewGetter(ViewGetter):
 
-    def __init__(self, sight_distance=None):
+    STRING_ENCODING = "string"
+    INTEGER_ENCODING = "integer"
+    DISTANCES_NUMBER = 7
+
+    def __init__(self, sight_distance=None, encoding=STRING_ENCODING):
+        if encoding not in [self.STRING_ENCODING, self.INTEGER_ENCODING]:
+            raise ValueError(f"Unknown view encoding: {encoding}")
+        if encoding == self.INTEGER_ENCODING and sight_distance is None:
+            raise ValueError("Integer view encoding requires a sight distance")
         self.sight_distance = sight_distance
+        self.encoding = encoding
+        self.key_type = int if encoding == self.INTEGER_ENCODING else str
+
+    @property
+    def states_number(self):
+        return (
+            self.distance_radix ** self.DISTANCES_NUMBER
+            * self.food_coordinate_radix ** 2
+        )
+
+    @property
+    def distance_radix(self):
+        return self.sight_distance + 1
+
+    @property
+    def food_coordinate_radix(self):
+        return 2 * self.sight_distance + 1
 
     def get_view(self, board: SnakeBoard):
         distances = [
@@ -52,23 +110,63 @@ class DistancesViewGetter(ViewGetter):
         food_vector = project_to_direction(
             sight_vector=food_vector, direction=board.direction
         )
+        food_coordinates = [
+            self.normalize_coordinate(food_vector[0]),
+            self.normalize_coordinate(food_vector[1]),
+        ]
+        if self.encoding == self.INTEGER_ENCODING:
+            return self.encode_view(distances, food_coordinates)
+        return self.view_to_string(distances, food_coordinates)
+
+    @classmethod
+    def view_to_string(cls, distances, food_coordinates):
         return (
             f"{'_'.join([str(dist) for dist in distances])}:"
-            f"{self.normalize_coordinate(food_vector[0])}_"
-            f"{self.normalize_coordinate(food_vector[1])}"
+            f"{food_coordinates[0]}_{food_coordinates[1]}"
         )
 
+    def encode_view(self, distances, food_coordinates):
+        # Mixed radix number: distances are in [0, sight_distance] and food
+        # coordinates are in [-sight_distance, sight_distance].
+        view = 0
+        for distance in distances:
+            view = view * self.distance_radix + int(distance)
+        for coordinate in food_coordinates:
+            view = (
+                view * self.food_coordinate_radix
+                + int(coordinate) + self.sight_distance
+            )
+        return view
+
+    def decode_view(self, view: int):
+        food_coordinates = []
+        for _ in range(2):
+            view, digit = divmod(view, self.food_coordinate_radix)
+            food_coordinates.insert(0, digit - self.sight_distance)
+        distances = []
+        for _ in range(self.DISTANCES_NUMBER):
+            view, digit = divmod(view, self.distance_radix)
+            distances.insert(0, digit)
+        return self.view_to_string(distances, food_coordinates)
+
+    def encode_string_view(self, view: str):
+        distances, food_coordinates = view.split(":")
+        return self.encode_view(
+            distances=[int(dist) for dist in distances.split("_")],
+            food_coordinates=[
+                int(coordinate) for coordinate in food_coordinates.split("_")
+            ],
+        )
+
+    def parse_key(self, key: str):
+        is_string_view = ":" in key
+        if self.encoding == self.INTEGER_ENCODING:
+            return self.encode_string_view(key) if is_string_view else int(key)
+        return key if is_string_view else self.decode_view(int(key))
+
     @classmethod
     def get_cross_directions(cls, direction: Direction):
-        return [
-            direction.to_array(),
-            direction.to_array() + SnakeAction.TURN_RIGHT.turn(direction).to_array(),
-            SnakeAction.TURN_RIGHT.turn(direction).to_array(),
-            -direction.to_array() + SnakeAction.TURN_RIGHT.turn(direction).to_array(),
-            -direction.to_array() + SnakeAction.TURN_LEFT.turn(direction).to_array(),
-            SnakeAction.TURN_LEFT.turn(direction).to_array(),
-            direction.to_array() + SnakeAction.TURN_LEFT.turn(direction).to_array(),
-        ]
+        return CROSS_DIRECTIONS[direction.value]
 
     def get_distance(self, board, direction):
         i = 0
@@ -0,0 +1,30 @@
+import pytest
+
+from snake_learner.learner import SnakeLearner
+from snake_learner.view_getter import DistancesViewGetter
+
+
+@pytest.fixture
+def build_learner():
+    def build(view_getter=None, **kwargs):
+        if view_getter is None:
+            view_getter = DistancesViewGetter(sight_distance=3)
+        configuration = dict(
+            rows=8,
+            columns=8,
+            view_getter=view_getter,
+            discount_factor=0.7,
+            alpha=0.6,
+            epsilon=0.1,
+            loss_change=0.15,
+            reward_change=0.15,
+            distance_change=0.5,
+            loss_penalty=1000,
+            eat_reward=1000,
+            move_reward=0,
+            max_moves_to_score=20,
+        )
+        configuration.update(kwargs)
+        return SnakeLearner(**configuration)
+
+    return build
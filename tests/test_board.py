@@ -250,9 +250,112 @@ def test_move_too_left():
     assert board.score == 6
 
 
-def test_random_food_in_snake():
-    with mock.patch("numpy.random.randint") as randint:
-        randint.side_effect = [3, 4, 5, 6]
-        board = SnakeBoard(rows=8, columns=8)
-        np.testing.assert_array_equal(board.food, [5, 6])
-        assert randint.call_count == 4
+def test_random_food_not_in_snake():
+    board = SnakeBoard(rows=3, columns=3)
+    for _ in range(100):
+        board.put_random_food()
+        assert not board.location_in_snake(board.food)
+
+
+def test_random_food_in_last_free_cell():
+    board = SnakeBoard(rows=2, columns=3)
+    board.snake = [
+        [0, 0],
+        [0, 1],
+        [0, 2],
+        [1, 2],
+        [1, 1],
+    ]
+    board.random = mock.Mock()
+    board.random.integers.return_value = 0
+    board.put_random_food()
+    board.random.integers.assert_called_once_with(1)
+    np.testing.assert_array_equal(board.food, [1, 0])
+    assert board.free_count == 1
+    assert not board.done
+
+
+def test_fill_board():
+    board = SnakeBoard(rows=2, columns=3)
+    board.snake = [
+        [0, 0],
+        [0, 1],
+        [0, 2],
+        [1, 2],
+        [1, 1],
+    ]
+    board.food = [1, 0]
+    board.move(Direction.LEFT)
+
+    assert board.score == 6
+    assert board.food is None
+    assert board.won
+    assert not board.lost
+    assert board.done
+
+
+def test_grid_follows_snake():
+    board = SnakeBoard(rows=8, columns=8)
+    board.snake = [
+        [3, 4],
+        [4, 4],
+        [5, 4],
+        [5, 5],
+    ]
+    board.food = [1, 1]
+    board.move(Direction.RIGHT)
+
+    expected_grid = np.zeros((8, 8), dtype=np.uint8)
+    for cell in [[4, 4], [5, 4], [5, 5], [5, 6]]:
+        expected_grid[cell[0], cell[1]] = 1
+    np.testing.assert_array_equal(board.grid, expected_grid)
+    free_cells = sorted(board.free_cells[:board.free_count])
+    assert free_cells == list(np.flatnonzero(expected_grid == 0))
+
+
+def test_location_in_snake_without_head():
+    board = SnakeBoard(rows=8, columns=8)
+    board.snake = [
+        [3, 4],
+        [4, 4],
+        [5, 4],
+        [6, 4],
+        [6, 5],
+        [5, 5],
+    ]
+    board.food = [1, 1]
+    board.move(Direction.LEFT)
+
+    assert board.location_in_snake([5, 4], include_head=False)
+    assert board.location_in_snake([5, 4])
+    assert board.location_in_snake([6, 5], include_head=False)
+    assert not board.location_in_snake([3, 4])
+    assert not board.location_in_snake([1, 1])
+    assert board.lost
+
+
+def test_location_in_snake_out_of_board():
+    board = SnakeBoard(rows=8, columns=8)
+    board.snake = [
+        [5, 7],
+        [6, 7],
+        [7, 7],
+    ]
+    board.food = [1, 1]
+    board.move(Direction.UP)
+
+    assert board.location_in_snake([8, 7])
+    assert not board.location_in_snake([8, 7], include_head=False)
+    assert not board.location_in_snake([9, 7])
+    assert board.lost
+
+
+def test_board_seed():
+    boards = [
+        SnakeBoard(rows=8, columns=8, random=np.random.default_rng(3))
+        for _ in range(2)
+    ]
+
+    np.testing.assert_array_equal(boards[0].snake, boards[1].snake)
+    np.testing.assert_array_equal(boards[0].food, boards[1].food)
+    assert boards[0].direction == boards[1].direction
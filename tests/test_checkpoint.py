@@ -0,0 +1,113 @@
+import json
+
+import numpy as np
+
+from snake_learner.checkpoint import DELTAS_FILE, HISTORY_BASE_FILE, \
+    Checkpointer, compact_checkpoint, load_checkpoint
+
+
+def assert_checkpoint_matches(directory, learner):
+    q_values, history, _ = load_checkpoint(directory)
+    assert history == list(learner.history)
+    assert set(q_values.keys()) == set(learner.q.keys())
+    for state, value in q_values.items():
+        np.testing.assert_array_equal(value, learner.q[state])
+
+
+def test_checkpoint_and_resume(tmp_path, build_learner):
+    learner = build_learner()
+    with Checkpointer(learner=learner, directory=tmp_path, every_iterations=2):
+        for _ in range(5):
+            learner.run_train_iteration()
+    assert_checkpoint_matches(tmp_path, learner)
+
+    _, _, sequence = load_checkpoint(tmp_path)
+    with Checkpointer(
+        learner=learner,
+        directory=tmp_path,
+        every_iterations=2,
+        resume_sequence=sequence,
+    ) as checkpointer:
+        for _ in range(3):
+            learner.run_train_iteration()
+            checkpointer.update(1)
+        assert checkpointer.sequence == sequence + 1
+    assert len(learner.history) == 8
+    assert_checkpoint_matches(tmp_path, learner)
+
+
+def test_load_checkpoint_skips_broken_and_compacted_deltas(tmp_path, build_learner):
+    learner = build_learner()
+    with Checkpointer(learner=learner, directory=tmp_path):
+        learner.run_train_iteration()
+    _, _, sequence = load_checkpoint(tmp_path)
+    with open(tmp_path / DELTAS_FILE, mode="w") as fd:
+        fd.write(json.dumps(dict(sequence=sequence, states={}, history=[{}])))
+        fd.write("\n")
+        fd.write('{"sequence": ')
+
+    assert_checkpoint_matches(tmp_path, learner)
+    compact_checkpoint(tmp_path)
+    assert not (tmp_path / DELTAS_FILE).exists()
+    assert_checkpoint_matches(tmp_path, learner)
+
+
+def test_checkpoint_logs_removed_states(tmp_path, build_learner):
+    learner = build_learner()
+    with Checkpointer(learner=learner, directory=tmp_path) as checkpointer:
+        for _ in range(3):
+            learner.run_train_iteration()
+        checkpointer.checkpoint()
+        learner.clear_states_by_strength(top_k=5)
+        learner.run_train_iteration()
+
+    assert_checkpoint_matches(tmp_path, learner)
+
+
+def test_compaction_appends_history(tmp_path, build_learner):
+    learner = build_learner()
+    with Checkpointer(
+        learner=learner, directory=tmp_path, every_iterations=1, compact_every=2
+    ) as checkpointer:
+        for _ in range(4):
+            learner.run_train_iteration()
+            checkpointer.update(1)
+    # An interrupted write leaves a partial line that later ones skip.
+    with open(tmp_path / DELTAS_FILE, mode="w") as fd:
+        fd.write('{"sequence": ')
+    _, _, sequence = load_checkpoint(tmp_path)
+    with Checkpointer(
+        learner=learner, directory=tmp_path, resume_sequence=sequence
+    ):
+        learner.run_train_iteration()
+
+    with open(tmp_path / HISTORY_BASE_FILE, mode="r") as fd:
+        history_parts = [json.loads(line) for line in fd]
+    assert [len(part["history"]) for part in history_parts] == [2, 2, 0, 1]
+    assert_checkpoint_matches(tmp_path, learner)
+
+
+def test_checkpoint_with_evictions(tmp_path, build_learner):
+    learner = build_learner(max_states=50, seed=3)
+    evicted_ids = []
+    learner.q.eviction_callbacks.append(evicted_ids.extend)
+    with Checkpointer(
+        learner=learner, directory=tmp_path, every_iterations=2, compact_every=3
+    ) as checkpointer:
+        for _ in range(10):
+            learner.run_train_iteration()
+            checkpointer.update(1)
+    assert len(evicted_ids) != 0
+    assert_checkpoint_matches(tmp_path, learner)
+
+    q_values, history, sequence = load_checkpoint(tmp_path)
+    resumed_learner = build_learner(max_states=50, seed=3)
+    resumed_learner.q.update(q_values)
+    for history_point in history:
+        resumed_learner.add_history_point(history_point)
+    with Checkpointer(
+        learner=resumed_learner, directory=tmp_path, resume_sequence=sequence
+    ):
+        for _ in range(5):
+            resumed_learner.run_train_iteration()
+    assert_checkpoint_matches(tmp_path, resumed_learner)
@@ -0,0 +1,90 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from snake_learner.board import SnakeBoard
+from snake_learner.direction import Direction
+from snake_learner.history import EpisodeHistory
+from snake_learner.snake_action import SnakeAction
+
+
+def play_random_game(board):
+    snapshots = []
+    while not board.done:
+        board.turn(SnakeAction(board.random.integers(len(SnakeAction))))
+        snapshots.append((list(board.snake), board.food))
+    return snapshots
+
+
+def test_history_rebuilds_every_move():
+    random = np.random.default_rng(3)
+    for _ in range(20):
+        board = SnakeBoard(
+            rows=5, columns=5, max_moves_to_score=20, random=random
+        )
+        snapshots = play_random_game(board)
+
+        assert len(board.history) == board.moves
+        for moves, (history_point, (snake, food)) in enumerate(
+            zip(board.history, snapshots), start=1
+        ):
+            assert history_point.moves == moves
+            np.testing.assert_array_equal(history_point.snake, snake)
+            np.testing.assert_array_equal(history_point.food, food)
+
+
+def test_history_random_access():
+    board = SnakeBoard(rows=8, columns=8, random=np.random.default_rng(0))
+    board.snake = [
+        [3, 4],
+        [4, 4],
+        [5, 4],
+        [5, 5],
+    ]
+    board.food = [5, 6]
+    board.move(Direction.RIGHT)
+    new_food = board.food
+    board.move(Direction.UP)
+
+    np.testing.assert_array_equal(
+        board.history[-1].snake, [[4, 4], [5, 4], [5, 5], [5, 6], [6, 6]]
+    )
+    np.testing.assert_array_equal(board.history[-1].food, new_food)
+    np.testing.assert_array_equal(
+        board.history[0].snake, [[3, 4], [4, 4], [5, 4], [5, 5], [5, 6]]
+    )
+    assert board.history[0].score == 5
+    assert [point.moves for point in board.history[::-1]] == [2, 1]
+
+
+def test_history_disabled():
+    board = SnakeBoard(rows=8, columns=8, record_history=False)
+    board.snake = [
+        [3, 4],
+        [4, 4],
+    ]
+    board.food = [1, 1]
+    board.move(Direction.UP)
+
+    assert len(board.history) == 0
+
+
+@pytest.mark.parametrize("spill", [False, True], ids=["memory", "memmap"])
+def test_episode_history(tmp_path, spill):
+    history = EpisodeHistory(
+        initial_capacity=2, directory=tmp_path if spill else None
+    )
+    history_points = [
+        dict(score=i, duration=2 * i, rewards=i / 2, states=i + 1, velocity=0.5)
+        for i in range(5)
+    ]
+    history.extend(history_points)
+
+    assert len(history) == 5
+    assert list(history) == history_points
+    assert history[-1] == history_points[-1]
+    assert history[1:3] == history_points[1:3]
+    np.testing.assert_array_equal(history.column("duration"), [0, 2, 4, 6, 8])
+    assert history.column("rewards").dtype == np.float64
+    assert pickle.loads(pickle.dumps(history))[:] == history_points
@@ -0,0 +1,92 @@
+import json
+
+import numpy as np
+
+from snake_learner.profiler import PHASES, Profiler
+from snake_learner.view_getter import DistancesViewGetter
+
+
+class CountingViewGetter(DistancesViewGetter):
+
+    def __init__(self, sight_distance=None):
+        super().__init__(sight_distance=sight_distance)
+        self.calls = 0
+
+    def get_view(self, board):
+        self.calls += 1
+        return super().get_view(board)
+
+
+def test_view_computed_once_per_state(build_learner):
+    view_getter = CountingViewGetter(sight_distance=3)
+    learner = build_learner(view_getter=view_getter, seed=1)
+    for _ in range(10):
+        learner.run_train_iteration()
+
+    durations = sum(history_point["duration"] for history_point in learner.history)
+    # Every state but the terminal one of each game is viewed exactly once.
+    assert view_getter.calls == durations
+
+
+def test_recent_statistics(build_learner):
+    learner = build_learner(statistics_window=4, seed=2)
+    for _ in range(10):
+        learner.run_train_iteration()
+    scores = [history_point["score"] for history_point in learner.history]
+
+    assert learner.recent_scores_mean(4) == np.mean(scores[-4:])
+    assert learner.recent_scores_mean(6) == np.mean(scores[-6:])
+    assert learner.max_score == np.max(scores)
+
+
+def test_seeded_learners_match(build_learner):
+    learners = [build_learner(seed=11) for _ in range(2)]
+    for learner in learners:
+        for _ in range(5):
+            learner.run_train_iteration()
+
+    assert list(learners[0].history) == list(learners[1].history)
+    assert learners[0].q.to_dict() == learners[1].q.to_dict()
+
+
+def test_profiled_training_matches(build_learner):
+    learners = [build_learner(seed=5) for _ in range(2)]
+    learners[1].profiler = Profiler()
+    for learner in learners:
+        for _ in range(5):
+            learner.run_train_iteration()
+
+    assert list(learners[0].history) == list(learners[1].history)
+    summary = learners[1].profiler.summary()
+    assert summary["episodes"] == 5
+    assert summary["steps"] == sum(
+        history_point["duration"] for history_point in learners[1].history
+    )
+    assert set(summary["phases"]) == set(PHASES)
+    assert all(
+        summary["phases"][phase]["seconds"] > 0 for phase in PHASES
+    )
+
+
+def test_save_pruned_q_file(tmp_path, build_learner):
+    learner = build_learner()
+    learner.q.update({"a": [3, 4, 0], "b": [0, 0, 1], "c": [0, 6, 0]})
+    path = tmp_path / "q_values.json"
+    learner.save_q_to_file(path, min_strength=2, top_k=1)
+
+    with open(path, mode="r") as fd:
+        assert json.load(fd) == {"c": [0, 6, 0]}
+    assert learner.states_number == 3
+
+
+def test_load_binary_q_file(tmp_path, build_learner):
+    learner = build_learner()
+    for _ in range(3):
+        learner.run_train_iteration()
+    path = tmp_path / "q_values.qbin"
+    learner.save_q_to_file(path)
+
+    loaded_learner = build_learner()
+    loaded_learner.load_q_from_file(path)
+
+    assert loaded_learner.q.to_dict() == learner.q.to_dict()
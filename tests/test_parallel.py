@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from snake_learner.parallel import ParallelTrainer, play_best_of
+from snake_learner.profiler import Profiler
+
+
+def test_merge_averages_worker_deltas(build_learner):
+    learner = build_learner()
+    learner.q["a"] = [1, 1, 1]
+    trainer = ParallelTrainer(learner=learner, workers_number=2)
+    history_point = dict(score=3, duration=4, rewards=0, states=0, velocity=0.75)
+
+    trainer.merge(
+        [
+            (["a", "b"], np.array([[2, 0, 0], [0, 4, 0]]), [history_point], None, None),
+            (["a"], np.array([[0, 0, 4]]), [dict(history_point)], None, None),
+        ]
+    )
+
+    np.testing.assert_array_equal(learner.q["a"], [2, 1, 3])
+    np.testing.assert_array_equal(learner.q["b"], [0, 4, 0])
+    assert trainer.pending_states == ["a", "b"]
+    np.testing.assert_array_equal(trainer.pending_values, [[2, 1, 3], [0, 4, 0]])
+    assert len(learner.history) == 2
+    assert learner.history[-1]["states"] == 2
+
+
+@pytest.mark.parametrize(
+    ["workers_number", "sync_iterations"], [(0, 100), (2, 0)]
+)
+def test_parallel_trainer_rejects_empty_rounds(
+    build_learner, workers_number, sync_iterations
+):
+    with pytest.raises(ValueError):
+        ParallelTrainer(
+            learner=build_learner(),
+            workers_number=workers_number,
+            sync_iterations=sync_iterations,
+        )
+
+
+def test_parallel_training(build_learner):
+    learner = build_learner()
+    with ParallelTrainer(
+        learner=learner, workers_number=2, sync_iterations=3
+    ) as trainer:
+        completed = list(trainer.train(10))
+
+    assert sum(completed) == 10
+    assert len(learner.history) == 10
+    assert learner.states_number > 0
+    assert learner.best_game is not None
+    assert learner.best_game.score == learner.max_score
+
+
+def test_parallel_training_profile(build_learner):
+    learner = build_learner()
+    learner.profiler = Profiler()
+    with ParallelTrainer(
+        learner=learner, workers_number=2, sync_iterations=3
+    ) as trainer:
+        list(trainer.train(10))
+
+    assert learner.profiler.episodes == 10
+    assert learner.profiler.steps == sum(
+        history_point["duration"] for history_point in learner.history
+    )
+
+
+def test_play_best_of(build_learner):
+    learners = [build_learner(seed=3) for _ in range(2)]
+    for learner in learners:
+        for _ in range(10):
+            learner.run_train_iteration()
+    q_values = learners[0].q.to_dict()
+
+    seed, score = play_best_of(learners[0], games_number=8, workers_number=2)
+    board = learners[0].play(seed=seed, update_q=False)
+
+    assert play_best_of(learners[1], games_number=8) == (seed, score)
+    assert board.score == score
+    assert len(board.history) == board.moves
+    played_q_values = learners[0].q.to_dict()
+    assert {state: played_q_values[state] for state in q_values} == q_values
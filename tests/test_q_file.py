@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from snake_learner.q_file import BINARY_FORMAT, JSON_FORMAT, LazyQTable, \
+    MappedQFile, convert_q_file, load_q_items, q_file_format, save_q
+from snake_learner.q_table import QTable
+
+
+@pytest.mark.parametrize(
+    "states", [["b_1", "a_2", "c 3"], [7, 2, 11]], ids=["str", "int"]
+)
+def test_binary_q_file(tmp_path, states):
+    values = np.array([[1, 2, 3], [4, 5, 6], [7, 8, 9]], dtype=float)
+    path = tmp_path / "q_values.qbin"
+    save_q(states=states, values=values, path=path)
+
+    q_file = MappedQFile(path)
+
+    assert q_file_format(path) == BINARY_FORMAT
+    assert len(q_file) == 3
+    assert sorted(q_file.states) == sorted(states)
+    for state, value in zip(states, values):
+        np.testing.assert_array_equal(q_file.lookup(state), value)
+    assert q_file.lookup(states[0] * 2) is None
+
+
+def test_empty_binary_q_file(tmp_path):
+    path = tmp_path / "q_values.qbin"
+    save_q(states=[], values=np.zeros((0, 3)), path=path)
+
+    q_file = MappedQFile(path)
+
+    assert len(q_file) == 0
+    assert q_file.lookup("a") is None
+
+
+def test_lazy_q_table(tmp_path):
+    path = tmp_path / "q_values.qbin"
+    save_q(states=["a", "b"], values=np.array([[1, 2, 3], [4, 5, 6]]), path=path)
+
+    q = LazyQTable(MappedQFile(path))
+
+    assert len(q) == 0
+    np.testing.assert_array_equal(q["b"], [4, 5, 6])
+    np.testing.assert_array_equal(q["c"], [0, 0, 0])
+    assert len(q) == 2
+
+
+def test_convert_q_file(tmp_path):
+    q = QTable()
+    q.update({"12": [1, 2, 3], "5": [4, 5, 6]})
+    json_path = tmp_path / "q_values.json"
+    binary_path = tmp_path / "q_values.qbin"
+    back_path = tmp_path / "q_values_back.json"
+    save_q(states=q.states, values=q.values, path=json_path)
+
+    convert_q_file(json_path, binary_path)
+    convert_q_file(binary_path, back_path)
+
+    assert q_file_format(json_path) == JSON_FORMAT
+    assert MappedQFile(binary_path).key_type is int
+    assert dict(load_q_items(back_path)) == {"5": [4, 5, 6], "12": [1, 2, 3]}
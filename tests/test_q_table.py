@@ -0,0 +1,191 @@
+import multiprocessing
+
+import numpy as np
+
+from snake_learner.q_table import BoundedQTable, QTable, SharedQTable, \
+    strength_mask
+
+
+def test_q_table_new_state_is_zero():
+    q = QTable()
+
+    np.testing.assert_array_equal(q["a"], [0, 0, 0])
+    assert len(q) == 1
+    assert "a" in q
+    assert "b" not in q
+
+
+def test_q_table_update_row():
+    q = QTable()
+    q["a"][1] += 2.5
+    q["b"] = [1, 2, 3]
+
+    np.testing.assert_array_equal(q["a"], [0, 2.5, 0])
+    np.testing.assert_array_equal(q.values, [[0, 2.5, 0], [1, 2, 3]])
+    assert q.to_dict() == {"a": [0, 2.5, 0], "b": [1, 2, 3]}
+
+
+def test_q_table_grows():
+    q = QTable(initial_capacity=2)
+    for i in range(10):
+        q[str(i)] = [i, 0, 0]
+
+    assert len(q) == 10
+    assert q.capacity >= 10
+    assert list(q.keys()) == [str(i) for i in range(10)]
+    np.testing.assert_array_equal(q.values[:, 0], np.arange(10))
+
+
+def test_q_table_update_rows():
+    q = QTable(initial_capacity=2)
+    q.update_rows(["a", "b", "c"], np.array([[1, 0, 0], [2, 0, 0], [3, 0, 0]]))
+    q.update_rows(["c", "d"], np.array([[4, 0, 0], [5, 0, 0]]))
+
+    assert list(q.keys()) == ["a", "b", "c", "d"]
+    np.testing.assert_array_equal(q.values[:, 0], [1, 2, 4, 5])
+    np.testing.assert_array_equal(q["b"], [2, 0, 0])
+
+
+def test_q_table_tracks_changes():
+    q = QTable()
+    q.update({"a": [1, 0, 0], "b": [5, 0, 0]})
+    q.track_changes()
+    q["c"][0] += 3
+    q["b"][0] += 1
+    q.keep_states(np.array([False, True, True]))
+
+    changed_ids, removed_states = q.take_changes()
+
+    assert [q.states[state_id] for state_id in changed_ids] == ["b", "c"]
+    assert removed_states == ["a"]
+    assert q.take_changes()[0].tolist() == []
+
+
+def test_q_table_strengths():
+    q = QTable()
+    q.update({"a": [3, 4, 0], "b": [0, 0, 1]})
+
+    np.testing.assert_array_almost_equal(q.strengths(), [5, 1])
+
+
+def test_q_table_clear_by_strength():
+    q = QTable()
+    q.update({"a": [3, 4, 0], "b": [0, 0, 1], "c": [0, 6, 0]})
+    q.clear_by_strength(2)
+
+    assert q.to_dict() == {"a": [3, 4, 0], "c": [0, 6, 0]}
+    np.testing.assert_array_equal(q["c"], [0, 6, 0])
+    np.testing.assert_array_equal(q["d"], [0, 0, 0])
+    assert len(q) == 3
+
+
+def test_q_table_clear_by_top_k():
+    q = QTable()
+    q.update({"a": [3, 4, 0], "b": [0, 0, 1], "c": [0, 6, 0]})
+    q.clear_by_strength(top_k=1)
+
+    assert type(q) is QTable
+    assert q.to_dict() == {"c": [0, 6, 0]}
+
+
+def test_strength_mask():
+    strengths = np.array([5, 1, 6, 3, 2])
+
+    np.testing.assert_array_equal(
+        strength_mask(strengths, min_strength=2), [1, 0, 1, 1, 0]
+    )
+    np.testing.assert_array_equal(
+        strength_mask(strengths, percentile=50), [1, 0, 1, 1, 0]
+    )
+    np.testing.assert_array_equal(strength_mask(strengths, top_k=2), [1, 0, 1, 0, 0])
+    np.testing.assert_array_equal(
+        strength_mask(strengths, min_strength=5.5, top_k=2), [0, 0, 1, 0, 0]
+    )
+    np.testing.assert_array_equal(strength_mask(strengths, top_k=10), np.ones(5))
+    assert len(strength_mask(np.zeros(0), top_k=1)) == 0
+
+
+def test_q_table_export_mask():
+    q = QTable()
+    q.update({"a": [3, 4, 0], "b": [0, 0, 1], "c": [0, 6, 0]})
+    states, values = q.export(np.array([True, False, True]))
+
+    assert states == ["a", "c"]
+    np.testing.assert_array_equal(values, [[3, 4, 0], [0, 6, 0]])
+    assert len(q) == 3
+
+
+def test_bounded_q_table_evicts_cold_states():
+    q = BoundedQTable(max_states=4, evict_fraction=0.25, candidates_factor=2)
+    evicted = []
+    q.eviction_callbacks.append(lambda state_ids: evicted.extend(state_ids))
+    q.update({"a": [1, 0, 0], "b": [0, 5, 0], "c": [0, 0, 1], "d": [2, 0, 0]})
+    # "a" and "b" are the least recently visited, and "a" is weaker.
+    q["c"], q["d"]
+    q["e"] = [0, 0, 7]
+
+    assert len(q) == 4
+    assert "a" not in q
+    assert evicted == [0]
+    # The row of "a" is reused.
+    assert q.index["e"] == 0
+    assert q.to_dict() == {
+        "e": [0, 0, 7], "b": [0, 5, 0], "c": [0, 0, 1], "d": [2, 0, 0],
+    }
+
+
+def test_bounded_q_table_prefers_rarely_visited_states():
+    q = BoundedQTable(max_states=3, evict_fraction=0.34, candidates_factor=2)
+    q.update({"a": [9, 0, 0], "b": [1, 0, 0], "c": [0, 0, 0]})
+    q["a"], q["a"], q["c"]
+    q["d"]
+
+    assert set(q.keys()) == {"a", "c", "d"}
+
+
+def test_bounded_q_table_clear_by_strength():
+    q = BoundedQTable(max_states=10)
+    q.update({"a": [3, 4, 0], "b": [0, 0, 1], "c": [0, 6, 0]})
+    q.clear_by_strength(2)
+
+    assert q.to_dict() == {"a": [3, 4, 0], "c": [0, 6, 0]}
+    np.testing.assert_array_almost_equal(q.strengths(), [5, 6])
+    assert len(q) == 2
+    states, values = q.export()
+    assert states == ["a", "c"]
+    np.testing.assert_array_equal(values, [[3, 4, 0], [0, 6, 0]])
+
+
+def add_to_shared_q(q, state, action_index, value):
+    q[state][action_index] += value
+
+
+def test_shared_q_table():
+    q = SharedQTable(states_number=10)
+    q[3][1] += 2
+    q[7] = [1, 0, 0]
+
+    assert len(q) == 2
+    assert 3 in q
+    assert 4 not in q
+    assert q.to_dict() == {3: [0, 2, 0], 7: [1, 0, 0]}
+    np.testing.assert_array_almost_equal(q.strengths(), [2, 1])
+    q.clear_by_strength(1.5)
+    assert q.to_dict() == {3: [0, 2, 0]}
+    q.close()
+
+
+def test_shared_q_table_between_processes():
+    q = SharedQTable(states_number=10)
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=add_to_shared_q, args=(q, state, 2, 1.5))
+        for state in [4, 5]
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    assert q.to_dict() == {4: [0, 0, 1.5], 5: [0, 0, 1.5]}
+    q.close()
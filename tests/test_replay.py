@@ -0,0 +1,92 @@
+import numpy as np
+
+from snake_learner.replay import TERMINAL_STATE, ReplayBuffer
+
+
+def test_replay_buffer_is_a_ring():
+    replay_buffer = ReplayBuffer(capacity=3)
+    for i in range(5):
+        replay_buffer.add(i, i % 3, float(i), i + 1)
+
+    assert len(replay_buffer) == 3
+    np.testing.assert_array_equal(replay_buffer.states, [3, 4, 2])
+    np.testing.assert_array_equal(replay_buffer.rewards, [3, 4, 2])
+    assert set(replay_buffer.sample(20)) <= {0, 1, 2}
+
+
+def test_replay_discard_states():
+    replay_buffer = ReplayBuffer(capacity=4)
+    for i in range(6):
+        replay_buffer.add(i, 0, float(i), i + 1)
+    replay_buffer.discard_states(np.array([3]))
+
+    assert len(replay_buffer) == 2
+    np.testing.assert_array_equal(replay_buffer.states[:2], [4, 5])
+    np.testing.assert_array_equal(replay_buffer.rewards[:2], [4, 5])
+    replay_buffer.add(7, 0, 7.0, TERMINAL_STATE)
+    np.testing.assert_array_equal(replay_buffer.states[:3], [4, 5, 7])
+
+
+def test_replay_update_q():
+    replay_buffer = ReplayBuffer(capacity=4)
+    replay_buffer.add(0, 1, 2.0, 1)
+    replay_buffer.add(1, 0, -1.0, TERMINAL_STATE)
+    values = np.array([[0, 0, 0], [4, 0, 0]], dtype=float)
+    replay_buffer.sample = lambda batch_size: np.array([0, 1, 0])
+
+    replay_buffer.update_q(values, batch_size=3, alpha=0.5, discount_factor=0.5)
+
+    # The first transition is sampled twice but applied once.
+    np.testing.assert_array_equal(values, [[0, 2, 0], [1.5, 0, 0]])
+
+
+def test_replay_update_q_averages_shared_pairs():
+    replay_buffer = ReplayBuffer(capacity=4)
+    replay_buffer.add(0, 1, 2.0, TERMINAL_STATE)
+    replay_buffer.add(0, 1, 4.0, TERMINAL_STATE)
+    values = np.zeros((1, 3))
+    replay_buffer.sample = lambda batch_size: np.array([0, 1])
+
+    replay_buffer.update_q(values, batch_size=2, alpha=0.5, discount_factor=0.5)
+
+    np.testing.assert_array_equal(values, [[0, 1.5, 0]])
+
+
+def test_prioritized_replay():
+    replay_buffer = ReplayBuffer(
+        capacity=4, prioritized=True, random=np.random.default_rng(0)
+    )
+    replay_buffer.add(0, 0, 1.0, TERMINAL_STATE)
+    replay_buffer.add(1, 0, 0.0, TERMINAL_STATE)
+    replay_buffer.update_priorities(np.array([0, 1]), np.array([1.0, 0.0]))
+
+    assert set(replay_buffer.sample(20)) == {0}
+    assert replay_buffer.max_priority == 1.0 + 1e-6
+    replay_buffer.add(2, 0, 0.0, TERMINAL_STATE)
+    assert replay_buffer.priorities[2] == replay_buffer.max_priority
+
+
+def test_learner_with_replay(build_learner):
+    learner = build_learner(
+        replay_buffer_size=100, replay_batch_size=8, move_reward=1, seed=4
+    )
+    for _ in range(5):
+        learner.run_train_iteration()
+
+    assert len(learner.replay_buffer) == min(learner.replay_steps, 100)
+    assert np.any(learner.q.values != 0)
+
+
+def test_learner_with_replay_and_max_states(build_learner):
+    learner = build_learner(
+        replay_buffer_size=100, replay_batch_size=8, max_states=50, seed=4
+    )
+    for _ in range(20):
+        learner.run_train_iteration()
+
+    assert len(learner.q) <= 50
+    live = learner.q.live[:len(learner.q.states)]
+    buffered = learner.replay_buffer.states[:len(learner.replay_buffer)]
+    next_buffered = learner.replay_buffer.next_states[:len(learner.replay_buffer)]
+    assert np.all(live[buffered])
+    assert np.all(live[next_buffered[next_buffered != TERMINAL_STATE]])
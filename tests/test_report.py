@@ -0,0 +1,32 @@
+import numpy as np
+
+from snake_learner.history import EpisodeHistory
+from snake_learner.report import PlotReport
+
+
+def test_plot_report(tmp_path):
+    random = np.random.default_rng(0)
+    history = EpisodeHistory()
+    scores = random.integers(1, 20, size=20_000).tolist()
+    rewards = random.normal(size=20_000).tolist()
+    for states, (score, reward) in enumerate(zip(scores, rewards)):
+        history.append(
+            dict(
+                score=score,
+                duration=10 * score,
+                rewards=reward,
+                states=states,
+                velocity=0.1,
+            )
+        )
+
+    with PlotReport(
+        history=history,
+        state_strengths=random.random(100),
+        output_dir=tmp_path,
+        plot_window=100,
+        workers_number=2,
+    ):
+        pass
+
+    assert len(list(tmp_path.glob("*.png"))) == 18
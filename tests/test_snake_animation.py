@@ -0,0 +1,118 @@
+import numpy as np
+from matplotlib import pyplot as plt
+from PIL import Image
+
+from snake_learner.board import SnakeBoard
+from snake_learner.direction import Direction
+from snake_learner.snake_action import SnakeAction
+from snake_learner.snake_animation import BODY, FOOD, HEAD, PALETTE, WALL, \
+    SnakeAnimation, eat_indices, raster_frame, select_frames
+
+
+def build_board():
+    board = SnakeBoard(rows=4, columns=6, random=np.random.default_rng(0))
+    board.snake = [[1, 1], [1, 2], [1, 3]]
+    board.food = np.array([3, 5])
+    board.move(Direction.RIGHT)
+    board.move(Direction.UP)
+    return board
+
+
+def test_raster_frame():
+    board = build_board()
+    frame = raster_frame(board.history[-1], cell_size=2)
+
+    assert frame.shape == (12, 16)
+    # Board cell (row, column) is painted at flipped row rows - row.
+    cells = frame[::2, ::2]
+    np.testing.assert_array_equal(cells[0, 0], WALL)
+    np.testing.assert_array_equal(cells[4 - 2, 1 + 4], HEAD)
+    np.testing.assert_array_equal(cells[4 - 1, 1 + 4], BODY)
+    np.testing.assert_array_equal(cells[4 - 1, 1 + 3], BODY)
+    np.testing.assert_array_equal(cells[4 - 3, 1 + 5], FOOD)
+
+
+def test_update_moves_artists():
+    board = build_board()
+    animation = SnakeAnimation(history=board.history)
+    animation.fig, animation.ax = plt.subplots()
+    animation.init_artists()
+
+    animation.update(1)
+
+    np.testing.assert_array_equal(
+        animation.body_scatter.get_offsets(), [[3, 1], [4, 1]]
+    )
+    np.testing.assert_array_equal(animation.head_scatter.get_offsets(), [[4, 2]])
+    np.testing.assert_array_equal(animation.food_scatter.get_offsets(), [[5, 3]])
+    assert animation.status_text.get_text() == "Move 2/2, Score 3"
+    plt.close(animation.fig)
+
+
+def test_save_raster_gif(tmp_path):
+    board = build_board()
+    output = tmp_path / "snake_game.gif"
+
+    SnakeAnimation(history=board.history).save(output, raster=True)
+
+    with Image.open(output) as image:
+        assert image.n_frames == len(board.history)
+        image.seek(image.n_frames - 1)
+        np.testing.assert_array_equal(
+            np.array(image.convert("RGB")),
+            PALETTE[raster_frame(board.history[-1])],
+        )
+
+
+def test_select_frames_keeps_events():
+    frames = select_frames(length=1_000, eat_indices=np.array([10, 500]), max_frames=20)
+
+    assert len(frames) == 20
+    assert np.all(np.diff(frames) > 0)
+    assert {0, 10, 500, 999} <= set(frames.tolist())
+
+
+def test_select_frames_too_many_events():
+    frames = select_frames(
+        length=1_000, eat_indices=np.arange(1, 999, 2), max_frames=10
+    )
+
+    assert len(frames) <= 10
+    assert frames[-1] == 999
+
+
+def test_select_frames_short_game():
+    np.testing.assert_array_equal(
+        select_frames(length=5, eat_indices=np.array([2]), max_frames=10),
+        np.arange(5),
+    )
+
+
+def test_eat_indices():
+    board = build_board()
+    board.food = board.head + [0, 1]
+    board.move(Direction.RIGHT)
+    board.move(Direction.RIGHT)
+
+    np.testing.assert_array_equal(board.history.eat_indices(), [2])
+    np.testing.assert_array_equal(eat_indices(list(board.history)), [2])
+
+
+def test_save_raster_gif_max_frames(tmp_path):
+    random = np.random.default_rng(2)
+    board = SnakeBoard(rows=8, columns=8, max_moves_to_score=30, random=random)
+    while not board.done:
+        actions = board.valid_actions() or [SnakeAction.FORWARD]
+        board.turn(actions[random.integers(len(actions))])
+    output = tmp_path / "snake_game.gif"
+
+    SnakeAnimation(history=board.history, max_frames=5).save(output, raster=True)
+
+    assert len(board.history) > 5
+    with Image.open(output) as image:
+        assert image.n_frames == 5
+        image.seek(image.n_frames - 1)
+        np.testing.assert_array_equal(
+            np.array(image.convert("RGB")),
+            PALETTE[raster_frame(board.history[-1])],
+        )
@@ -1,6 +1,8 @@
 import numpy as np
 
-from snake_learner.stat_util import moving_max, moving_mean
+from snake_learner.stat_util import (
+    RollingStatistics, UniformBuffer, decimate, moving_max, moving_mean
+)
 
 
 def test_moving_max():
@@ -18,3 +20,53 @@ def test_moving_mean():
         np.array([3, 3.5, 2.5, 5, 4.5, 6]),
         moving_mean(values, n=n),
     )
+
+
+def test_moving_mean_floats():
+    values = np.random.default_rng(0).normal(size=1_000)
+    np.testing.assert_allclose(
+        np.convolve(values, np.ones(10), mode="valid") / 10,
+        moving_mean(values, n=10),
+    )
+
+
+def test_decimate():
+    values = np.zeros(1_000)
+    values[123] = 5
+    values[777] = -5
+
+    indices, decimated = decimate(values, max_points=100)
+
+    assert len(decimated) <= 100
+    np.testing.assert_array_equal(values[indices], decimated)
+    assert np.all(np.diff(indices) > 0)
+    assert 123 in indices
+    assert 777 in indices
+
+
+def test_decimate_short_values():
+    values = np.array([3, 1, 2])
+    indices, decimated = decimate(values, max_points=100)
+
+    np.testing.assert_array_equal(indices, [0, 1, 2])
+    np.testing.assert_array_equal(decimated, values)
+
+
+def test_rolling_statistics():
+    values = np.array([1, 5, 2, 3, 7, 2, 10])
+    statistics = RollingStatistics(window=3)
+    assert statistics.mean is None
+    assert statistics.max is None
+
+    for i, value in enumerate(values):
+        statistics.add(value)
+        assert statistics.mean == np.mean(values[max(i - 2, 0):i + 1])
+        assert statistics.max == np.max(values[:i + 1])
+
+
+def test_uniform_buffer():
+    uniforms = UniformBuffer(np.random.default_rng(1), block_size=4)
+    values = [uniforms.next() for _ in range(10)]
+    np.testing.assert_array_equal(
+        np.random.default_rng(1).random(12)[:10], values
+    )
@@ -0,0 +1,92 @@
+import numpy as np
+
+from snake_learner.board import SnakeBoard
+from snake_learner.direction import Direction
+from snake_learner.snake_action import SnakeAction
+from snake_learner.vector_board import VectorSnakeBoard
+
+
+def assert_consistent_grid(vector_board):
+    for index in range(vector_board.boards_number):
+        length = vector_board.length[index]
+        cells = vector_board.body[
+            index,
+            (vector_board.tail_index[index] + np.arange(length))
+            % vector_board.capacity
+        ]
+        expected_grid = np.zeros(vector_board.shape, dtype=np.uint8)
+        np.add.at(expected_grid, (cells[:, 0], cells[:, 1]), 1)
+        np.testing.assert_array_equal(vector_board.grid[index], expected_grid)
+
+
+def test_vector_board_initialization():
+    vector_board = VectorSnakeBoard(boards_number=50, rows=5, columns=5)
+
+    np.testing.assert_array_equal(vector_board.score, np.full(50, 3))
+    np.testing.assert_array_equal(vector_board.moves, np.zeros(50))
+    assert not np.any(vector_board.done)
+    assert_consistent_grid(vector_board)
+    food = vector_board.food
+    assert np.all(vector_board.grid[np.arange(50), food[:, 0], food[:, 1]] == 0)
+
+
+def test_vector_board_move():
+    vector_board = VectorSnakeBoard(boards_number=3, rows=8, columns=8)
+    vector_board.set_board(
+        0, snake=[[3, 4], [4, 4], [5, 4], [5, 5]], direction=Direction.RIGHT,
+        food=[5, 6],
+    )
+    vector_board.set_board(
+        1, snake=[[4, 4], [4, 5], [4, 6], [4, 7]], direction=Direction.RIGHT,
+        food=[1, 1],
+    )
+    vector_board.set_board(
+        2, snake=[[3, 4], [4, 4], [5, 4], [5, 5]], direction=Direction.RIGHT,
+        food=[1, 1],
+    )
+
+    done = vector_board.turn(
+        [
+            SnakeAction.FORWARD.value,
+            SnakeAction.FORWARD.value,
+            SnakeAction.TURN_LEFT.value,
+        ]
+    )
+
+    np.testing.assert_array_equal(done, [False, True, False])
+    np.testing.assert_array_equal(vector_board.final_score, [0, 4, 0])
+    np.testing.assert_array_equal(vector_board.episodes, [0, 1, 0])
+    np.testing.assert_array_equal(vector_board.score, [5, 3, 4])
+    np.testing.assert_array_equal(vector_board.head[[0, 2]], [[5, 6], [6, 5]])
+    assert not np.array_equal(vector_board.food[0], [5, 6])
+    assert_consistent_grid(vector_board)
+
+
+def test_vector_board_matches_snake_board():
+    random = np.random.default_rng(7)
+    boards = [SnakeBoard(rows=6, columns=6, random=random) for _ in range(20)]
+    vector_board = VectorSnakeBoard(
+        boards_number=len(boards), rows=6, columns=6, auto_reset=False
+    )
+    for index, board in enumerate(boards):
+        vector_board.set_board(
+            index, snake=list(board.snake), direction=board.direction,
+            food=board.food,
+        )
+    active = np.ones(len(boards), dtype=bool)
+    while np.any(active):
+        actions = random.integers(len(SnakeAction), size=len(boards))
+        for index, board in enumerate(boards):
+            if active[index]:
+                board.turn(SnakeAction(actions[index]))
+        vector_board.turn(actions)
+        for index, board in enumerate(boards):
+            if not active[index]:
+                continue
+            assert vector_board.score[index] == board.score
+            assert vector_board.lost[index] == board.lost
+            np.testing.assert_array_equal(vector_board.head[index], board.head)
+            # Food is drawn independently, so games are compared until the
+            # first time food gets eaten.
+            if board.lost or board.score > 3:
+                active[index] = False
@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from snake_learner.board import SnakeBoard
+from snake_learner.direction import Direction
+from snake_learner.snake_action import SnakeAction
+from snake_learner.view_getter import DistancesViewGetter, GridViewGetter
+
+
+def random_boards(games_number, rows=8, columns=8):
+    random = np.random.default_rng(5)
+    for _ in range(games_number):
+        board = SnakeBoard(
+            rows=rows, columns=columns, max_moves_to_score=10, random=random
+        )
+        while not board.done:
+            yield board
+            board.turn(SnakeAction(random.integers(len(SnakeAction))))
+
+
+def test_distances_view_string():
+    board = SnakeBoard(rows=8, columns=8)
+    board.snake = [
+        [3, 4],
+        [4, 4],
+        [5, 4],
+    ]
+    board.direction = Direction.UP
+    board.food = [5, 6]
+    view_getter = DistancesViewGetter(sight_distance=3)
+
+    assert view_getter.get_view(board) == "2_2_3_3_3_3_2:0_2"
+
+
+def test_integer_encoding_round_trip():
+    view_getter = DistancesViewGetter(
+        sight_distance=3, encoding=DistancesViewGetter.INTEGER_ENCODING
+    )
+    view = "3_0_1_2_3_0_2:-3_2"
+
+    encoded = view_getter.encode_string_view(view)
+
+    assert 0 <= encoded < view_getter.states_number
+    assert view_getter.decode_view(encoded) == view
+    assert view_getter.parse_key(view) == encoded
+    assert view_getter.parse_key(str(encoded)) == encoded
+
+
+def test_integer_encoding_matches_string_encoding():
+    string_view_getter = DistancesViewGetter(sight_distance=2)
+    integer_view_getter = DistancesViewGetter(
+        sight_distance=2, encoding=DistancesViewGetter.INTEGER_ENCODING
+    )
+    views = set()
+    for board in random_boards(20):
+        string_view = string_view_getter.get_view(board)
+        integer_view = integer_view_getter.get_view(board)
+        assert integer_view_getter.decode_view(integer_view) == string_view
+        assert string_view_getter.parse_key(str(integer_view)) == string_view
+        views.add(integer_view)
+    assert len(views) > 1
+
+
+def test_integer_encoding_requires_sight_distance():
+    with pytest.raises(ValueError):
+        DistancesViewGetter(encoding=DistancesViewGetter.INTEGER_ENCODING)
+
+
+def grid_view_by_cells(board, sight_distance):
+    sight = []
+    for i in range(-sight_distance, sight_distance + 1):
+        for j in range(-sight_distance, sight_distance + 1):
+            location = board.head + np.array([i, j])
+            if np.array_equal(location, board.food):
+                sight.append(GridViewGetter.FOOD)
+            elif board.is_valid_location(location):
+                sight.append(GridViewGetter.EMPTY)
+            else:
+                sight.append(GridViewGetter.BLOCK)
+    return "".join(sight)
+
+
+def test_grid_view():
+    board = SnakeBoard(rows=8, columns=8)
+    board.snake = [
+        [0, 1],
+        [0, 0],
+        [1, 0],
+    ]
+    board.food = [2, 1]
+    view_getter = GridViewGetter(sight_distance=1)
+
+    assert view_getter.get_view(board) == "XXXXX X F"
+
+
+@pytest.mark.parametrize("sight_distance", [1, 2, 5, 10])
+def test_grid_view_matches_cells(sight_distance):
+    view_getter = GridViewGetter(sight_distance=sight_distance)
+    for board in random_boards(10):
+        assert view_getter.get_view(board) == grid_view_by_cells(
+            board, sight_distance
+        )